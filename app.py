@@ -9,12 +9,27 @@ import gspread
 # Import custom modules
 from config.config import Config
 from src.services.data_service import DataService
+from src.services.dataset_cache import dataset_version
+from src.models.ledger_schema import memory_report, to_export_frame
 from src.components.metrics_display import MetricsDisplay
 from src.components.transaction_form import TransactionForm
 from src.components.summary_dashboard import SummaryDashboard
 from src.components.leave_tracker import LeaveTracker
 from src.utils.calendar_generator import CalendarGenerator
-from src.styles.css_styles import get_main_css
+from src.styles.css_styles import get_main_css, get_all_calendar_css
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def build_excel_export(_df: pd.DataFrame, version: str) -> bytes:
+    """Excel bytes of the ledger, built once per dataset version"""
+    # Convert datetime to string for Excel compatibility
+    df_download = to_export_frame(_df)
+    df_download["Date"] = df_download["Date"].dt.strftime("%Y-%m-%d")
+    
+    # Convert to Excel bytes
+    excel_buffer = BytesIO()
+    df_download.to_excel(excel_buffer, index=False, sheet_name="Finance_Data")
+    return excel_buffer.getvalue()
+
 
 class FinanceTrackerApp:
     """Main Finance Tracker Application"""
@@ -37,6 +52,7 @@ class FinanceTrackerApp:
         
         # Apply custom CSS
         st.markdown(get_main_css(), unsafe_allow_html=True)
+        st.markdown(get_all_calendar_css(), unsafe_allow_html=True)
         
         # Set title
         st.title("💸 Daily Tracker")
@@ -79,7 +95,7 @@ class FinanceTrackerApp:
                        "- Check your internet connection")
         
         # Show recent transactions
-        self.metrics_display.display_recent_transactions(df)
+        self.metrics_display.display_recent_transactions(df, pending_row_ids=self.data_service.get_pending_row_ids())
         
         # Download section
         self.render_download_section(df)
@@ -89,19 +105,10 @@ class FinanceTrackerApp:
         st.markdown("---")
         
         if not df.empty:
-            # Convert datetime to string for Excel compatibility
-            df_download = df.copy()
-            df_download["Date"] = df_download["Date"].dt.strftime("%Y-%m-%d")
-            
-            # Convert to Excel bytes
-            excel_buffer = BytesIO()
-            df_download.to_excel(excel_buffer, index=False, sheet_name="Finance_Data")
-            excel_buffer.seek(0)
-            
             # Download button
             st.download_button(
                 label="📊 Download as Excel",
-                data=excel_buffer.getvalue(),
+                data=build_excel_export(df, dataset_version(df)),
                 file_name=f"finance_tracker_{datetime.now().strftime('%Y%m%d')}.xlsx",
                 mime="application/vnd.openxlsx",
                 use_container_width=True
@@ -127,11 +134,8 @@ class FinanceTrackerApp:
             st.warning("Please select at least one month to view summary")
             return
         
-        # Filter data for selected period
-        selected_period_df = self.data_service.get_monthly_data(df, selected_year, selected_months)
-        
         # Calculate totals
-        totals = self.data_service.get_category_totals(selected_period_df)
+        totals = self.data_service.get_category_totals(df, selected_year, selected_months)
         total_investment_alltime = self.data_service.get_category_totals(df)['investment']
         
         # Display period
@@ -142,41 +146,47 @@ class FinanceTrackerApp:
         # Display metrics
         self.metrics_display.display_summary_metrics(totals, total_investment_alltime)
         
+        # Running balance and cumulative investment up to the end of the selected period
+        self.summary_dashboard.create_balance_chart(df, selected_year, max(selected_months))
+        
         # Charts Section
-        if not selected_period_df.empty:
-            # For calendar display, use the first selected month
-            calendar_year = selected_year
-            calendar_month = selected_months[0] if selected_months else None
-            
-            if len(selected_months) > 1:
-                st.info(f"📅 Calendar shows daily breakdown for {datetime(2000, selected_months[0], 1).strftime('%B')} {calendar_year} (first selected month)")
-            
-            # Chart tabs
-            chart_tab1, chart_tab2, chart_tab3 = st.tabs(["💸 Expenses", "📈 Investments", "💰 Income"])
-            
-            with chart_tab1:
-                self.summary_dashboard.render_category_tab(
-                    df, "Expense", Config.CATEGORY_COLORS["Expense"], 
-                    calendar_year, selected_months, "expense"
-                )
-            
-            with chart_tab2:
-                self.summary_dashboard.render_category_tab(
-                    df, "Investment", Config.CATEGORY_COLORS["Investment"], 
-                    calendar_year, selected_months, "investment"
-                )
-            
-            with chart_tab3:
-                self.summary_dashboard.render_category_tab(
-                    df, "Income", Config.CATEGORY_COLORS["Income"], 
-                    calendar_year, selected_months, "income"
-                )
+        if not self.data_service.get_cube(df).select(selected_year, selected_months).empty:
+            # Chart tabs; only the open one is rendered
+            self.summary_dashboard.render_category_tabs(df, selected_year, selected_months)
     
     def render_leave_tab(self, df: pd.DataFrame):
         """Render the leave tracking tab"""
         self.leave_tracker.render(df)
     
-    def render_debug_section(self):
+    def notify_fresh_data(self):
+        """Let the user know when a background refresh brought in newer data"""
+        version = self.data_service.dataset_version
+        seen_version = st.session_state.get("dataset_version")
+        if seen_version is not None and version != seen_version:
+            st.toast("🔄 Data refreshed")
+        st.session_state.dataset_version = version
+    
+    def render_connection_status(self):
+        """Show a banner while the remote store is unavailable"""
+        status = self.data_service.get_connection_status()
+        if status.get("seed_error"):
+            st.warning(f"⚠️ Could not copy the ledger from Google Sheets into the local store: {status['seed_error']}")
+        if status["state"] == "closed" and not self.data_service.read_only:
+            return
+        
+        since = ""
+        if status.get("down_since"):
+            since = f" since {datetime.fromtimestamp(status['down_since']).strftime('%H:%M')}"
+        retry = f" Next check in {status['retry_in_seconds']}s." if status.get("retry_in_seconds") else ""
+        
+        if status.get("mirror"):
+            st.info(f"☁️ Google Sheets mirror unreachable{since}. "
+                    f"{self.data_service.get_pending_write_count()} entries will be synced when it is back.{retry}")
+        else:
+            st.warning(f"⚠️ Google Sheets unreachable{since} - showing the last synced data (read-only). "
+                       f"New entries are saved locally and synced when the connection returns.{retry}")
+    
+    def render_debug_section(self, df: pd.DataFrame):
         """Render debug panel if debug mode is enabled"""
         if not Config.get_debug_mode():
             return
@@ -184,13 +194,39 @@ class FinanceTrackerApp:
         st.markdown("---")
         st.subheader("🔧 Debug Panel")
         
-        if st.button("🧪 Test Google Sheets Connection"):
-            success, message = self.data_service.sheets_service.test_connection()
+        if st.button(f"🧪 Test {self.data_service.backend.name} Connection"):
+            success, message = self.data_service.test_connection()
             if success:
                 st.success(f"✅ {message}")
             else:
                 st.error(f"❌ {message}")
         
+        st.write(f"📤 Pending sheet writes: {self.data_service.get_pending_write_count()}")
+        
+        cache_age = self.data_service.dataset_cache.age_seconds
+        if cache_age is not None:
+            flight = self.data_service.dataset_cache.flight
+            st.write(f"🗂️ Dataset version {self.data_service.dataset_version}, loaded {cache_age:.0f}s ago "
+                     f"({flight.executions} fetches, {flight.coalesced} coalesced)")
+            report = memory_report(df)
+            st.write(f"🧮 Ledger memory: {report['bytes'] / 1024:,.0f} KB for {report['rows']} rows "
+                     f"({report.get('reduction', 0)}x smaller than plain strings)")
+            cube_cache = self.data_service.cube_cache
+            st.write(f"🧊 Aggregate cube: {cube_cache.builds} builds, {cube_cache.extensions} incremental updates")
+            balance_cache = self.data_service.balance_series_cache
+            st.write(f"📉 Balance series: {balance_cache.builds} builds, {balance_cache.extensions} incremental updates")
+        
+        tab_timings = self.summary_dashboard.get_tab_timings()
+        if tab_timings["rendered"]:
+            rendered = ", ".join(f"{category} {tab_timings['times'][category]:.0f} ms" for category in tab_timings["rendered"])
+            deferred = ", ".join(tab_timings["deferred"]) or "none"
+            st.write(f"⏱️ Summary tabs: rendered {rendered}; deferred {deferred} "
+                     f"(~{tab_timings['saved_ms']:.0f} ms saved this rerun)")
+        
+        with st.expander("📶 Sheets API usage"):
+            st.json(self.data_service.get_api_stats())
+            st.json(self.data_service.get_connection_status())
+        
         if st.button("🔄 Clear All Caches"):
             self.data_service.clear_cache()
             st.cache_data.clear()
@@ -202,11 +238,12 @@ class FinanceTrackerApp:
         """Main application runner"""
         # Load data
         df = self.data_service.load_data()
+        self.notify_fresh_data()
+        self.render_connection_status()
         
         # Check connection if no data
         if df.empty:
-            test_ws = self.data_service.sheets_service.get_worksheet()
-            if test_ws is None:
+            if not self.data_service.is_available():
                 st.error("❌ Could not connect to Google Sheets. Please check your credentials and sheet permissions.")
                 st.info("💡 Common issues:\n- Check if 'MyFinanceTracker' spreadsheet exists\n- Verify the service account has edit permissions\n- Ensure 'Tracker' worksheet exists\n- Check your secrets configuration")
                 st.stop()
@@ -224,7 +261,7 @@ class FinanceTrackerApp:
             self.render_leave_tab(df)
         
         # Debug section
-        self.render_debug_section()
+        self.render_debug_section(df)
 
 def main():
     """Application entry point"""
@@ -18,9 +18,40 @@ class Config:
         "https://www.googleapis.com/auth/drive"
     ]
     
+    # Sheets API quotas (per user, per minute) enforced by the central rate limiter
+    SHEETS_READ_QUOTA_PER_MINUTE = 60
+    SHEETS_WRITE_QUOTA_PER_MINUTE = 60
+    
+    # Circuit breaker for Google Sheets outages
+    CIRCUIT_FAILURE_THRESHOLD = 3  # Consecutive failures before the circuit opens
+    CIRCUIT_RESET_SECONDS = 30  # First half-open probe after this long
+    CIRCUIT_MAX_RESET_SECONDS = 600  # Probe interval doubles on each failed probe up to this
+    
     # Cache Configuration
     CACHE_TTL_HOURS = 1  # 1 hour for resource cache
-    CACHE_TTL_MINUTES = 5  # 5 minutes for data cache
+    CACHE_TTL_MINUTES = 5  # Data younger than 5 minutes is served without revalidating
+    CACHE_MAX_STALENESS_MINUTES = 60  # Older than this, page loads wait for fresh data
+    WORKSHEET_HANDLE_TTL_MINUTES = 30  # Re-validate pooled worksheet handles after 30 minutes
+    
+    # Delta Sync Configuration
+    SYNC_TAIL_WINDOW_ROWS = 20  # Trailing rows re-read and checksummed on every sync
+    SYNC_FULL_RELOAD_MINUTES = 15  # Edits above the tail window are picked up by a full reload this often
+    TIMESTAMP_COLUMN_INDEX = 6  # add_record appends the IST timestamp after the 6 transaction fields
+    
+    # Write Queue Configuration
+    WRITE_QUEUE_BATCH_SIZE = 20  # Flush as soon as this many rows are waiting
+    WRITE_QUEUE_MAX_DELAY_SECONDS = 1.0  # ...or once the oldest row has waited this long
+    WRITE_QUEUE_MAX_BACKOFF_SECONDS = 60.0  # Longest wait between attempts after repeated failed flushes
+    
+    # Storage Backend Configuration
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sheets")  # "sheets" or "sqlite"
+    SHEETS_MIRROR_ENABLED = os.getenv("SHEETS_MIRROR", "True").lower() == "true"  # sqlite only
+    
+    # Local Storage Configuration
+    LOCAL_DB_PATH = os.getenv("FINANCE_TRACKER_DB", "data/finance_tracker.db")
+    WAL_REPLAY_INTERVAL_SECONDS = 15  # How often pending local writes are replayed to the sheet
+    MIRROR_SEED_RETRY_SECONDS = 300  # Wait after a failed seed of the local store before trying again
+    ROW_ID_COLUMN_INDEX = 7  # Idempotent row ID is written after the timestamp column
     
     # Categories and Subcategories
     SUBCATEGORIES: Dict[str, List[str]] = {
@@ -44,6 +75,10 @@ class Config:
     }
 
 
+    # People who pay for household transactions
+    PAYERS: List[str] = ["Shubham", "Yashika"]
+
+
     # High-level grouping for bar chart axis only
     CATEGORY_GROUPING: Dict[str, str] = {
         # Fun
@@ -67,6 +102,18 @@ class Config:
         "Insurance": "Fixed"
     }
 
+    # Trend chart windows (key -> label); "<n>M" is the last n months including the current one
+    TREND_WINDOWS: Dict[str, str] = {
+        "3M": "3 Months",
+        "6M": "6 Months",
+        "12M": "12 Months",
+        "24M": "24 Months",
+        "YTD": "Year to Date",
+        "FY": "Fiscal Year"
+    }
+    DEFAULT_TREND_WINDOW = "6M"
+    FISCAL_YEAR_START_MONTH = 4  # Indian fiscal year starts in April
+
     # UI Configuration
     CATEGORY_COLORS = {
         "Income": "#28a745",
@@ -76,6 +123,9 @@ class Config:
         "Leave": "#6366f1"
     }
     
+    # Colors for per-payer amounts, assigned in payer order and cycled for larger households
+    PAYER_COLORS = ["#2196f3", "#e91e63", "#9c27b0", "#ff9800", "#009688", "#795548"]
+    
     # Theme colors for different metric types
     METRIC_THEMES = {
         "income": {"bg": "#ecfdf5", "color": "#10b981", "border": "#10b981"},
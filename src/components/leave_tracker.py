@@ -17,7 +17,7 @@ class LeaveTracker:
         col1, col2 = st.columns(2)
         
         with col1:
-            available_years = sorted(df["Date"].dt.year.unique(), reverse=True)
+            available_years = self.data_service.get_available_years(df)
             default_year = datetime.now().year if datetime.now().year in available_years else available_years[0]
             leave_selected_year = st.selectbox(
                 "Year", 
@@ -70,7 +70,8 @@ class LeaveTracker:
         
         # Generate and display leave calendar
         leave_calendar_html = self.calendar_generator.create_leave_calendar_view(
-            df, leave_selected_year, leave_selected_month
+            leave_summary['leave_days'],
+            leave_selected_year, leave_selected_month
         )
         st.markdown(leave_calendar_html, unsafe_allow_html=True)
     
@@ -87,6 +88,6 @@ class LeaveTracker:
         current_year = datetime.now().year
         current_month = datetime.now().month
         empty_calendar = self.calendar_generator.create_leave_calendar_view(
-            pd.DataFrame(), current_year, current_month
+            {}, current_year, current_month
         )
         st.markdown(empty_calendar, unsafe_allow_html=True)
\ No newline at end of file
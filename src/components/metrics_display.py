@@ -1,5 +1,7 @@
 import streamlit as st
 from src.utils.formatters import format_amount, format_currency
+from config.config import Config
+from src.models.ledger_schema import AMOUNT_PAISE_COLUMN, to_rupees
 
 class MetricsDisplay:
     """Component for displaying financial metrics"""
@@ -18,11 +20,14 @@ class MetricsDisplay:
     def display_summary_metrics(totals: dict, total_investment_alltime: float = 0):
         """Display summary metrics in a grid layout"""
         
-        # Format expense breakdown
+        # Format expense breakdown, one colored amount per payer
+        payer_amounts = " &nbsp;|&nbsp; ".join(
+            f"<span style='color: {Config.PAYER_COLORS[index % len(Config.PAYER_COLORS)]};' title='{payer}'>{format_amount(amount)}</span>"
+            for index, (payer, amount) in enumerate(totals.get('expense_by_payer', {}).items())
+        )
         expense_breakdown = f"""₹{totals['expense']:,.0f}<br>
                             <small style='font-size: 0.7rem;'>
-                                <span style='color: #2196f3'>{format_amount(totals['expense_shubham'])}</span> &nbsp;|&nbsp;
-                                <span style='color: #e91e63;'>{format_amount(totals['expense_yashika'])}</span>
+                                {payer_amounts}
                             </small>"""
         
         # Format investment with total
@@ -71,8 +76,8 @@ class MetricsDisplay:
         st.markdown(grid_html, unsafe_allow_html=True)
 
     @staticmethod
-    def display_recent_transactions(df, count: int = 5):
-        """Display recent transactions"""
+    def display_recent_transactions(df, count: int = 5, pending_row_ids: set = frozenset()):
+        """Display recent transactions, marking ones not yet confirmed by a sync"""
         if df.empty:
             return
         
@@ -82,17 +87,16 @@ class MetricsDisplay:
         # Get last 5 rows from the dataframe (most recent entries by index)
         recent_df = df[df["Category"] != "Leave"].tail(count).iloc[::-1]  # Get last 5 and reverse order
         
-        from config.config import Config
-        
         for _, row in recent_df.iterrows():
             date_str = row["Date"].strftime("%d %b")
             color = Config.CATEGORY_COLORS.get(row["Category"], "#6c757d")
+            pending = " ⏳" if str(row.get("Row ID", "")) in pending_row_ids else ""
             
             st.markdown(f"""
             <div class="recent-entry">
-                <span class="entry-date">{date_str}</span> | 
+                <span class="entry-date">{date_str}{pending}</span> | 
                 <span class="entry-category" style="color: {color};">{row["Category"]}</span> - {row["Subcategory"]}
-                <span class="entry-amount" style="color: {color};">₹{row["Amount (₹)"]:,.0f}</span>
+                <span class="entry-amount" style="color: {color};">₹{to_rupees(row[AMOUNT_PAISE_COLUMN]):,.0f}</span>
                 <br><small style="color: black;">{row["Description"]}</small>
             </div>
             """, unsafe_allow_html=True)
\ No newline at end of file
@@ -1,16 +1,28 @@
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import calendar
+import time
 from src.utils.formatters import format_amount
 from src.utils.calendar_generator import CalendarGenerator
+from src.utils.month_layout import WEEKDAY_NAMES
+from src.services.balance_series import BALANCE_COLUMN, INVESTED_COLUMN
+from src.services.dataset_cache import dataset_version
 from config.config import Config
 
 class SummaryDashboard:
     """Component for displaying summary dashboard with analytics"""
     
+    # Category tabs of the summary: (tab label, category, calendar theme)
+    CATEGORY_TABS = [
+        ("💸 Expenses", "Expense", "expense"),
+        ("📈 Investments", "Investment", "investment"),
+        ("💰 Income", "Income", "income")
+    ]
+    
     def __init__(self, data_service):
         self.data_service = data_service
     
@@ -19,14 +31,13 @@ class SummaryDashboard:
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            available_years = sorted(df["Date"].dt.year.unique(), reverse=True)
+            available_years = self.data_service.get_available_years(df)
             default_year = datetime.now().year if datetime.now().year in available_years else available_years[0]
             selected_year = st.selectbox("Year", available_years, index=available_years.index(default_year))
         
         with col2:
             # Get months available for the selected year
-            year_data = df[df["Date"].dt.year == selected_year]
-            available_months = sorted(year_data["Date"].dt.month.unique())
+            available_months = self.data_service.get_available_months(df, selected_year)
             month_names = [(month, datetime(2000, month, 1).strftime('%B')) for month in available_months]
             
             # Set default to current month if available
@@ -53,21 +64,21 @@ class SummaryDashboard:
         
         return selected_year, selected_months
 
-    def create_category_chart(self, df: pd.DataFrame, category: str, theme_color: str) -> None:
+    def create_category_chart(self, df: pd.DataFrame, category: str, theme_color: str,
+                              year: int, months: list) -> None:
         """Create bar chart for a specific category (grouped on x-axis)"""
-        category_df = df[df["Category"] == category]
+        by_subcategory = self.data_service.get_category_breakdown(df, category, year, months)
 
-        if category_df.empty:
+        if by_subcategory.empty:
             st.info(f"No {category.lower()} data for selected period")
             return
 
         # ✅ Apply mapping for x-axis grouping
-        category_df["ChartGroup"] = category_df["Subcategory"].map(
-            Config.CATEGORY_GROUPING
-        ).fillna(category_df["Subcategory"])  # fallback to original if not mapped
+        subcategories = by_subcategory.index.astype(str)
+        chart_groups = subcategories.map(lambda name: Config.CATEGORY_GROUPING.get(name, name))  # fallback to original if not mapped
 
         # Group by the new axis label, but keep sum of amounts
-        category_by_group = category_df.groupby("ChartGroup")["Amount (₹)"].sum().reset_index()
+        category_by_group = by_subcategory.groupby(chart_groups).sum().rename_axis("ChartGroup").reset_index()
         category_by_group = category_by_group.sort_values("Amount (₹)", ascending=False)
         category_by_group['Amount_Label'] = category_by_group['Amount (₹)'].apply(format_amount)
 
@@ -97,13 +108,24 @@ class SummaryDashboard:
 
 
     def create_trend_chart(self, df: pd.DataFrame, category: str, theme_color: str) -> None:
-        """Create trend chart for a category"""
-        trend_data = self.data_service.get_monthly_trend(df, category, months=6)
-        trend_data["Amount_Label"] = trend_data["Amount (₹)"].apply(format_amount)
+        """Create trend chart for a category with a selectable window"""
+        window = st.radio(
+            "Trend window",
+            options=list(Config.TREND_WINDOWS),
+            index=list(Config.TREND_WINDOWS).index(Config.DEFAULT_TREND_WINDOW),
+            format_func=Config.TREND_WINDOWS.get,
+            horizontal=True,
+            label_visibility="collapsed",
+            key=f"trend_window_{category}"
+        )
+        trend_data = self.data_service.get_monthly_trend(df, category, window)
 
-        if trend_data.empty:
+        if trend_data.empty or trend_data["Amount (₹)"].max() <= 0:
+            st.info(f"No {category.lower()} data for the {Config.TREND_WINDOWS[window].lower()} window")
             return
 
+        trend_data["Amount_Label"] = trend_data["Amount (₹)"].map(format_amount)
+
         fig_line = px.line(
             trend_data,
             x="YearMonth",
@@ -111,7 +133,7 @@ class SummaryDashboard:
             text="Amount_Label",
             markers=True,
             line_shape="linear",
-            title="6 Months Trend"
+            title=f"{Config.TREND_WINDOWS[window]} Trend"
         )
 
         fig_line.update_traces(
@@ -135,7 +157,7 @@ class SummaryDashboard:
         y_pad = y_max * 0.2
         fig_line.update_yaxes(range=[0, y_max + y_pad])
         tick_step = y_max / 5
-        tick_vals = [round(i) for i in list(range(0, int(y_max * 1.1), int(tick_step)))]
+        tick_vals = [round(i) for i in list(range(0, int(y_max * 1.1), max(int(tick_step), 1)))]
 
         fig_line.update_yaxes(
             range=[0, y_max + y_max * 0.2],
@@ -146,6 +168,86 @@ class SummaryDashboard:
         st.plotly_chart(fig_line, use_container_width=True, config={'staticPlot': True})
 
 
+    def create_balance_chart(self, df: pd.DataFrame, year: int, month: int):
+        """Running balance (income − expense) and cumulative investment up to the end of a month"""
+        period_end = pd.Timestamp(year, month, 1) + pd.offsets.MonthEnd(0)
+        series = self.data_service.get_balance_series(df).between(end=period_end)
+        if series.empty:
+            return
+
+        chart_data = series.rename(columns={
+            BALANCE_COLUMN: "Balance", INVESTED_COLUMN: "Invested"
+        }).reset_index()
+        fig_balance = px.line(
+            chart_data,
+            x="Date",
+            y=["Balance", "Invested"],
+            title="Running Balance & Investments",
+            color_discrete_map={
+                "Balance": Config.CATEGORY_COLORS["Income"],
+                "Invested": Config.CATEGORY_COLORS["Investment"]
+            }
+        )
+        fig_balance.update_layout(
+            yaxis_title="Amount (₹)",
+            xaxis_title="Date",
+            legend_title_text="",
+            font=dict(size=12),
+            height=320,
+            title_font_size=16,
+            title_x=0.25,
+            margin=dict(t=80)
+        )
+
+        st.plotly_chart(fig_balance, use_container_width=True, config={'staticPlot': True})
+
+    def create_year_heatmap(self, df: pd.DataFrame, category: str, theme_color: str, year: int, months: list):
+        """Year-at-a-glance heatmap of daily amounts for the selected months (weeks × weekdays)"""
+        daily_totals = self.data_service.get_daily_totals(df, year, category)
+
+        # Lay every day of the year on a Sunday-first week grid
+        days = np.arange(np.datetime64(f"{year}-01-01"), np.datetime64(f"{year + 1}-01-01"))
+        weekdays = (days.astype(np.int64) + 4) % 7  # 1 January 1970 was a Thursday; 0 is Sunday
+        weeks = (np.arange(len(days)) + weekdays[0]) // 7
+        day_months = days.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        selected = np.isin(day_months, months)
+        if not selected.any():
+            return
+
+        amounts = np.full((7, weeks[-1] + 1), np.nan)
+        amounts[weekdays[selected], weeks[selected]] = daily_totals[:len(days)][selected]
+        first_week, last_week = weeks[selected].min(), weeks[selected].max()
+        amounts = amounts[:, first_week:last_week + 1]
+
+        # Label each selected month at the week holding its 1st
+        month_starts = np.flatnonzero(selected & (days.astype("datetime64[D]") == days.astype("datetime64[M]")))
+        fig_heatmap = go.Figure(go.Heatmap(
+            z=amounts,
+            x=np.arange(first_week, last_week + 1),
+            y=WEEKDAY_NAMES,
+            colorscale=[[0, "#f1f3f5"], [1, theme_color]],
+            xgap=3,
+            ygap=3,
+            showscale=False
+        ))
+        fig_heatmap.update_layout(
+            title=f"{year} Daily {category}",
+            font=dict(size=12),
+            height=260,
+            title_font_size=16,
+            title_x=0.32,
+            margin=dict(t=60, l=40, r=10, b=30),
+            plot_bgcolor="white"
+        )
+        fig_heatmap.update_xaxes(
+            tickvals=weeks[month_starts],
+            ticktext=[calendar.month_abbr[month] for month in day_months[month_starts]],
+            showgrid=False
+        )
+        fig_heatmap.update_yaxes(autorange="reversed", showgrid=False)
+
+        st.plotly_chart(fig_heatmap, use_container_width=True, config={'staticPlot': True})
+
     def render_category_tab(self, df: pd.DataFrame, category: str, theme_color: str, 
                             calendar_year: int, calendar_months, calendar_theme: str):
         """Render a complete category tab with calendar, charts, and trends"""
@@ -165,23 +267,61 @@ class SummaryDashboard:
         # Ensure it's a list (in case it was a tuple)
         calendar_months = list(calendar_months)
 
-        # ✅ Safe filtering with list (only if we have months to filter by)
-        if calendar_months:
-            df_filtered_for_chart = df[
-                (df["Date"].dt.year == calendar_year) &
-                (df["Date"].dt.month.isin(calendar_months))
-            ]
-        else:
-            # If no months selected, show empty results
-            df_filtered_for_chart = df[df["Category"] == category].iloc[0:0]  # Empty DataFrame with same structure
-
-        # Calendar View
-        if calendar_months:
+        # Calendar view for one month, year heatmap of every selected month otherwise
+        if len(calendar_months) > 1:
+            self.create_year_heatmap(df, category, theme_color, calendar_year, calendar_months)
+        elif calendar_months:
             calendar_html = CalendarGenerator.create_calendar_view(
-                df, calendar_year, calendar_months[0], category, calendar_theme
+                self.data_service.get_monthly_data(df, calendar_year, [calendar_months[0]]),
+                calendar_year, calendar_months[0], category, calendar_theme, version=dataset_version(df)
             )
             st.markdown(calendar_html, unsafe_allow_html=True)
 
         # Charts
-        self.create_category_chart(df_filtered_for_chart, category, theme_color)
-        self.create_trend_chart(df, category, theme_color)
\ No newline at end of file
+        self.create_category_chart(df, category, theme_color, calendar_year, calendar_months)
+        self.create_trend_chart(df, category, theme_color)
+
+    def render_category_tabs(self, df: pd.DataFrame, calendar_year: int, calendar_months):
+        """Render the category tabs, computing only the one that is open
+
+        Switching tabs reruns the script, so the calendar and charts of the
+        other tabs are deferred until they are selected. How long each tab
+        took the last time it rendered is kept in the session, which gives
+        the time saved by the deferred tabs (see get_tab_timings).
+        """
+        tabs = st.tabs([label for label, _, _ in self.CATEGORY_TABS], key="summary_category_tab", on_change="rerun")
+        times = st.session_state.setdefault("summary_tab_times", {})
+        rendered, deferred = [], []
+
+        for tab, (_, category, calendar_theme) in zip(tabs, self.CATEGORY_TABS):
+            # open is None when the tabs don't track state; render everything then
+            if tab.open is False:
+                deferred.append(category)
+                continue
+            started = time.perf_counter()
+            with tab:
+                self.render_category_tab(
+                    df, category, Config.CATEGORY_COLORS[category],
+                    calendar_year, calendar_months, calendar_theme
+                )
+            times[category] = (time.perf_counter() - started) * 1000
+            rendered.append(category)
+
+        st.session_state.summary_tab_rerun = {"rendered": rendered, "deferred": deferred}
+
+    @staticmethod
+    def get_tab_timings() -> dict:
+        """Render times of the category tabs and the time saved by deferring the closed ones this rerun"""
+        times = st.session_state.get("summary_tab_times", {})
+        rerun = st.session_state.get("summary_tab_rerun", {"rendered": [], "deferred": []})
+        return {
+            "times": dict(times),
+            "rendered": rerun["rendered"],
+            "deferred": rerun["deferred"],
+            # Tabs not opened yet have no measurement; count them at the average of the ones that have
+            "saved_ms": sum(
+                times.get(category, sum(times.values()) / len(times) if times else 0.0)
+                for category in rerun["deferred"]
+            )
+        }
+
@@ -72,7 +72,7 @@ class TransactionForm:
             )
             paid_by = st.selectbox(
                 "Paid By", 
-                ["Shubham", "Yashika"], 
+                Config.PAYERS, 
                 key=f"paidby_{self.form_key}"
             )
         else:
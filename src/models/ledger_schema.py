@@ -0,0 +1,168 @@
+import uuid
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, union_categoricals
+from config.config import Config
+
+# Sheet header of the amount column and the in-memory column that replaces it
+AMOUNT_COLUMN = "Amount (₹)"
+AMOUNT_PAISE_COLUMN = "Amount (paise)"
+
+# Fixed label sets; labels found in the data but not configured here are appended after them
+CATEGORY_LABELS: List[str] = list(Config.SUBCATEGORIES)
+SUBCATEGORY_LABELS: List[str] = list(dict.fromkeys(
+    subcategory for subcategories in Config.SUBCATEGORIES.values() for subcategory in subcategories
+))
+PAYER_LABELS: List[str] = list(Config.PAYERS)
+
+CATEGORICAL_LABELS: Dict[str, List[str]] = {
+    "Category": CATEGORY_LABELS,
+    "Subcategory": SUBCATEGORY_LABELS,
+    "Paid by": PAYER_LABELS,
+}
+
+# Free-text columns stored dictionary-encoded so repeated values are held once
+INTERNED_COLUMNS = ("Description",)
+
+# Sheet columns of a stamped row followed by its row ID
+ROW_COLUMNS = ["Date", "Category", "Subcategory", "Description", AMOUNT_COLUMN, "Paid by", "Timestamp", "Row ID"]
+
+# Row IDs start with a letter: rows are written USER_ENTERED, and Sheets would
+# turn an all-digit (or digits-e-digits) hex ID into a number
+ROW_ID_PREFIX = "r"
+
+
+def new_row_id() -> str:
+    """A fresh row ID that the sheet keeps as text"""
+    return ROW_ID_PREFIX + uuid.uuid4().hex
+
+
+def categorical(name: str, values: Iterable[Any]) -> pd.Categorical:
+    """Encode a label column against its configured categories"""
+    labels = pd.Series(np.asarray(values, dtype=object))
+    labels = labels.where(labels.notna(), "").astype(str)
+    configured = CATEGORICAL_LABELS[name]
+    known = set(configured)
+    extra = sorted(set(pd.unique(labels)) - known)
+    return pd.Categorical(labels, categories=configured + extra)
+
+
+def intern_text(values: Iterable[Any]) -> pd.Categorical:
+    """Dictionary-encode free text so each distinct string is stored once"""
+    text = pd.Series(np.asarray(values, dtype=object))
+    return pd.Categorical(text.where(text.notna(), "").astype(str))
+
+
+def to_paise(values: Iterable[Any]) -> np.ndarray:
+    """Convert rupee amounts (numbers or numeric text) to integer paise; blanks become 0"""
+    rupees = pd.to_numeric(pd.Series(np.asarray(values, dtype=object)), errors='coerce').fillna(0)
+    return np.round(rupees.to_numpy(dtype=float) * 100).astype(np.int64)
+
+
+def to_rupees(paise: Any) -> Any:
+    """Convert integer paise (scalar, array or Series) back to rupees"""
+    return paise / 100
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Give a ledger frame the compact in-memory schema (idempotent)"""
+    if df.empty and not len(df.columns):
+        return df
+    converted = {}
+    for name in CATEGORICAL_LABELS:
+        if name in df.columns and not _has_schema_dtype(df[name], name):
+            converted[name] = categorical(name, df[name].to_numpy(dtype=object))
+    for name in INTERNED_COLUMNS:
+        if name in df.columns and not isinstance(df[name].dtype, CategoricalDtype):
+            converted[name] = intern_text(df[name].to_numpy(dtype=object))
+    if AMOUNT_COLUMN in df.columns:
+        converted[AMOUNT_PAISE_COLUMN] = to_paise(df[AMOUNT_COLUMN].to_numpy(dtype=object))
+    if not converted:
+        return df
+    df = df.assign(**converted)
+    if AMOUNT_COLUMN in df.columns:
+        # Keep the amount where the sheet has it
+        position = df.columns.get_loc(AMOUNT_COLUMN)
+        df = df.drop(columns=AMOUNT_COLUMN)
+        df.insert(position, AMOUNT_PAISE_COLUMN, df.pop(AMOUNT_PAISE_COLUMN))
+    return df
+
+
+def rows_to_frame(rows: List[List[Any]], row_ids: List[str]) -> pd.DataFrame:
+    """Schema frame of stamped sheet rows (as written by DataService) and their row IDs"""
+    records = [(list(row) + [None] * len(ROW_COLUMNS))[:len(ROW_COLUMNS) - 1] + [row_id]
+               for row, row_id in zip(rows, row_ids)]
+    df = pd.DataFrame(records, columns=ROW_COLUMNS)
+    df["Date"] = pd.to_datetime(df["Date"], errors='coerce').astype("datetime64[ns]")
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors='coerce').astype("datetime64[ns]")
+    return apply_schema(df)
+
+
+def concat(base: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Append schema frames, merging category sets so label columns stay categorical"""
+    if base.empty:
+        return new
+    combined = pd.concat([base, new], ignore_index=True)
+    for name in tuple(CATEGORICAL_LABELS) + INTERNED_COLUMNS:
+        if name in base.columns and name in new.columns and not isinstance(combined[name].dtype, CategoricalDtype):
+            combined[name] = union_categoricals([base[name], new[name]])
+    return combined
+
+
+def freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """Make a ledger frame safe to share between sessions without copying
+
+    Remaining Python-object columns become Arrow-backed strings, and every
+    NumPy buffer behind the frame (values, datetimes, categorical codes) is
+    marked read-only. Views handed out still get copy-on-write semantics,
+    so a session can add or replace columns on its own view, but any
+    in-place write that would reach the shared buffers raises instead.
+    """
+    objects = [name for name in df.columns if df[name].dtype == object]
+    if objects:
+        df = df.astype({name: pd.StringDtype("pyarrow") for name in objects})
+    for name in df.columns:
+        values = getattr(df[name].array, "_ndarray", None)
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return df
+
+
+def to_export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Plain frame with rupee amounts and string labels, shaped like the sheet"""
+    export = df.copy()
+    for name in tuple(CATEGORICAL_LABELS) + INTERNED_COLUMNS:
+        if name in export.columns:
+            export[name] = export[name].astype(str)
+    if AMOUNT_PAISE_COLUMN in export.columns:
+        position = export.columns.get_loc(AMOUNT_PAISE_COLUMN)
+        export.insert(position, AMOUNT_COLUMN, to_rupees(export.pop(AMOUNT_PAISE_COLUMN)))
+    return export
+
+
+def memory_report(df: pd.DataFrame) -> Dict[str, Any]:
+    """Bytes used per column compared with plain object strings and float amounts"""
+    if df.empty:
+        return {"rows": 0, "bytes": 0, "object_baseline_bytes": 0, "columns": {}}
+    usage = df.memory_usage(deep=True, index=False)
+    baseline = to_export_frame(df).astype(
+        {name: object for name in tuple(CATEGORICAL_LABELS) + INTERNED_COLUMNS if name in df.columns}
+    ).memory_usage(deep=True, index=False)
+    return {
+        "rows": len(df),
+        "bytes": int(usage.sum()),
+        "object_baseline_bytes": int(baseline.sum()),
+        "reduction": round(float(baseline.sum()) / max(int(usage.sum()), 1), 1),
+        "columns": {str(name): int(size) for name, size in usage.items()},
+    }
+
+
+def _has_schema_dtype(column: pd.Series, name: str) -> bool:
+    """Whether a label column is already encoded against the configured categories"""
+    dtype = column.dtype
+    if not isinstance(dtype, CategoricalDtype):
+        return False
+    configured = CATEGORICAL_LABELS[name]
+    return list(dtype.categories[:len(configured)]) == configured
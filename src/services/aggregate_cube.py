@@ -0,0 +1,178 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from src.models.ledger_schema import AMOUNT_COLUMN, AMOUNT_PAISE_COLUMN, to_rupees
+from src.services.derived_cache import AppendExtendableCache
+from src.utils.month_layout import month_layout
+
+# Dimensions of every cube cell, coarsest first
+CUBE_DIMENSIONS = ["Year", "Month", "Day", "Category", "Subcategory", "Paid by"]
+
+
+class AggregateCube:
+    """Ledger totals materialized per year × month × day × category × subcategory × payer
+
+    Each cell holds the summed amount (integer paise) and the number of
+    entries. Label dimensions stay categorical, so grouping and filtering
+    run on integer codes. Query results are in rupees. Analytics
+    queries filter the (small) cell table instead of rescanning the ledger,
+    so their cost depends on the number of distinct days and labels rather
+    than on the number of transactions.
+    """
+
+    def __init__(self, cells: pd.DataFrame, rows: int):
+        self.cells = cells
+        self.rows = rows
+        self._monthly: Optional[pd.DataFrame] = None
+        self._trends: Dict[Tuple[int, int], pd.DataFrame] = {}
+        self._daily: Dict[int, Dict[str, np.ndarray]] = {}
+
+    @property
+    def monthly(self) -> pd.DataFrame:
+        """Cells rolled up over the day dimension, used by every month-level query"""
+        if self._monthly is None:
+            if self.cells.empty:
+                self._monthly = self.cells.drop(columns="Day")
+            else:
+                self._monthly = self.cells.groupby(
+                    [dimension for dimension in CUBE_DIMENSIONS if dimension != "Day"], observed=True, sort=False
+                )[[AMOUNT_PAISE_COLUMN, "Count"]].sum().reset_index()
+        return self._monthly
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "AggregateCube":
+        """Aggregate a ledger frame into cube cells"""
+        return cls(cls._aggregate(df), len(df))
+
+    def extend(self, new_rows: pd.DataFrame) -> "AggregateCube":
+        """Return a cube that also covers rows appended after the ones already aggregated"""
+        if new_rows.empty:
+            return self
+        if self.cells.empty:
+            return AggregateCube(self._aggregate(new_rows), self.rows + len(new_rows))
+        combined = pd.concat([self.cells, self._aggregate(new_rows)], ignore_index=True)
+        cells = combined.groupby(CUBE_DIMENSIONS, observed=True, sort=False)[[AMOUNT_PAISE_COLUMN, "Count"]].sum().reset_index()
+        return AggregateCube(cells, self.rows + len(new_rows))
+
+    def select(self, year: Optional[int] = None, months: Optional[List[int]] = None,
+               category: Optional[str] = None, subcategory: Optional[str] = None) -> pd.DataFrame:
+        """Month-level cells matching the given period and labels (None matches everything)"""
+        cells = self.monthly
+        if cells.empty:
+            return cells
+        mask = pd.Series(True, index=cells.index)
+        if year is not None:
+            mask &= cells["Year"] == year
+        if months is not None:
+            mask &= cells["Month"].isin(list(months))
+        if category is not None:
+            mask &= cells["Category"] == category
+        if subcategory is not None:
+            mask &= cells["Subcategory"] == subcategory
+        return cells[mask]
+
+    def payers(self) -> List[str]:
+        """Everyone who appears as a payer anywhere in the ledger"""
+        if self.monthly.empty:
+            return []
+        return sorted(str(payer) for payer in pd.unique(self.monthly["Paid by"]) if str(payer).strip())
+
+    def totals(self, year: Optional[int] = None, months: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Totals per category and per category × payer, from one grouped pass over the cells
+
+        Besides the income/expense/investment totals, ``category_payer`` maps
+        each category to the amount paid by every payer and
+        ``expense_by_payer`` holds the expense split over all payers in the
+        ledger (zero for payers with nothing in the period).
+        """
+        cells = self.select(year, months)
+        matrix = to_rupees(cells.groupby(["Category", "Paid by"], observed=True)[AMOUNT_PAISE_COLUMN].sum().unstack(fill_value=0))
+        by_category = matrix.sum(axis=1)
+        category_payer = {
+            str(category): {str(payer): float(amount) for payer, amount in row.items()}
+            for category, row in matrix.iterrows()
+        }
+        expense = category_payer.get("Expense", {})
+        return {
+            'income': float(by_category.get("Income", 0.0)),
+            'expense': float(by_category.get("Expense", 0.0)),
+            'investment': float(by_category.get("Investment", 0.0)),
+            'expense_by_payer': {payer: expense.get(payer, 0.0) for payer in self.payers()},
+            'category_payer': category_payer,
+        }
+
+    def breakdown(self, category: str, year: Optional[int] = None,
+                  months: Optional[List[int]] = None) -> pd.Series:
+        """Amount per subcategory of a category within a period"""
+        cells = self.select(year, months, category)
+        return to_rupees(cells.groupby("Subcategory", observed=True)[AMOUNT_PAISE_COLUMN].sum()).rename(AMOUNT_COLUMN)
+
+    def monthly_matrix(self, first_month: int, last_month: int) -> pd.DataFrame:
+        """Rupee totals per month (rows) and category (columns) over a month range
+
+        Months are counted as ``year * 12 + month - 1``; the range is
+        inclusive, and months without entries are filled with zero. The
+        matrix for a range is computed in one grouped pass and kept with
+        the cube.
+        """
+        key = (first_month, last_month)
+        if key not in self._trends:
+            cells = self.monthly.assign(MonthKey=self.monthly["Year"] * 12 + self.monthly["Month"] - 1)
+            cells = cells[(cells["MonthKey"] >= first_month) & (cells["MonthKey"] <= last_month)]
+            matrix = cells.groupby(["MonthKey", "Category"], observed=True)[AMOUNT_PAISE_COLUMN].sum()
+            matrix = to_rupees(matrix.unstack(fill_value=0)) if not matrix.empty else pd.DataFrame()
+            matrix = matrix.reindex(range(first_month, last_month + 1), fill_value=0.0)
+            matrix.columns = [str(category) for category in matrix.columns]
+            matrix.index = pd.to_datetime(
+                pd.DataFrame({"year": matrix.index // 12, "month": matrix.index % 12 + 1, "day": 1})
+            )
+            self._trends[key] = matrix
+        return self._trends[key]
+
+    def daily_totals(self, year: int) -> Dict[str, np.ndarray]:
+        """Rupee total per category for every day of a year
+
+        Each category gets a 366-slot array indexed by day of the year
+        (0 is 1 January; the last slot stays empty outside leap years),
+        filled from the day-level cells in one scatter-add and kept with
+        the cube.
+        """
+        if year not in self._daily:
+            cells = self.cells[self.cells["Year"] == year]
+            month_offsets = np.array([month_layout(year, month).year_offset for month in range(1, 13)])
+            day_of_year = month_offsets[cells["Month"].to_numpy(dtype=np.int64) - 1] + cells["Day"].to_numpy(dtype=np.int64) - 1
+            codes, categories = pd.factorize(cells["Category"].astype(str))
+            totals = np.zeros((len(categories), 366), dtype=np.int64)
+            np.add.at(totals, (codes, day_of_year), cells[AMOUNT_PAISE_COLUMN].to_numpy(dtype=np.int64))
+            daily = to_rupees(totals)
+            daily.flags.writeable = False
+            self._daily[year] = dict(zip(categories, daily))
+        return self._daily[year]
+
+    @staticmethod
+    def _aggregate(df: pd.DataFrame) -> pd.DataFrame:
+        """Group ledger rows into cube cells"""
+        if df.empty:
+            return pd.DataFrame(columns=CUBE_DIMENSIONS + [AMOUNT_PAISE_COLUMN, "Count"])
+        dates = df["Date"].dt
+        keys = pd.DataFrame({
+            "Year": dates.year.to_numpy(),
+            "Month": dates.month.to_numpy(),
+            "Day": dates.day.to_numpy(),
+            "Category": df["Category"].array,
+            "Subcategory": df["Subcategory"].array,
+            "Paid by": df["Paid by"].array if "Paid by" in df.columns else "",
+            AMOUNT_PAISE_COLUMN: df[AMOUNT_PAISE_COLUMN].to_numpy(),
+            "Count": 1,
+        })
+        return keys.groupby(CUBE_DIMENSIONS, observed=True, sort=False, dropna=False).agg(
+            {AMOUNT_PAISE_COLUMN: "sum", "Count": "sum"}
+        ).reset_index()
+
+
+@st.cache_resource
+def get_cube_cache() -> AppendExtendableCache[AggregateCube]:
+    """Get the process-wide aggregate cube cache"""
+    return AppendExtendableCache(AggregateCube.build, AggregateCube.extend)
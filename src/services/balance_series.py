@@ -0,0 +1,88 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from src.models.ledger_schema import AMOUNT_PAISE_COLUMN, to_rupees
+from src.services.derived_cache import AppendExtendableCache
+
+# Daily movement columns (integer paise) and the cumulative series built from them
+FLOW_COLUMNS = ["Income", "Expense", "Investment"]
+BALANCE_COLUMN = "Balance (₹)"
+INVESTED_COLUMN = "Invested (₹)"
+
+
+class BalanceSeries:
+    """Daily running balance (income − expense) and cumulative investment
+
+    Daily movements are summed per date in integer paise; the cumulative
+    series is a cumsum over them in date order. When rows are appended, only
+    their movements are grouped, and the cumsum is redone from the earliest
+    date they touch, so entries dated today cost a few days of work rather
+    than a pass over the whole history.
+    """
+
+    def __init__(self, daily: pd.DataFrame, rows: int, cumulative: Optional[pd.DataFrame] = None):
+        self.daily = daily
+        self.rows = rows
+        self.cumulative = cumulative if cumulative is not None else self._accumulate(daily)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "BalanceSeries":
+        """Daily movements and cumulative series of a ledger frame"""
+        return cls(cls._movements(df), len(df))
+
+    def extend(self, new_rows: pd.DataFrame) -> "BalanceSeries":
+        """Return a series that also covers rows appended after the ones already included"""
+        if new_rows.empty:
+            return self
+        movements = self._movements(new_rows)
+        rows = self.rows + len(new_rows)
+        if movements.empty:
+            return BalanceSeries(self.daily, rows, self.cumulative)
+        if self.daily.empty:
+            return BalanceSeries(movements, rows)
+
+        daily = self.daily.add(movements, fill_value=0).astype(np.int64)
+        start = movements.index[0]
+        # Days before the earliest new entry keep their running totals
+        prefix = self.cumulative[self.cumulative.index < start]
+        base = prefix.iloc[-1] if not prefix.empty else pd.Series(0.0, index=prefix.columns)
+        tail = self._accumulate(daily[daily.index >= start]) + base
+        return BalanceSeries(daily, rows, pd.concat([prefix, tail]))
+
+    def between(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Cumulative series for the days in [start, end] (None leaves that side open)"""
+        series = self.cumulative
+        if start is not None:
+            series = series[series.index >= pd.Timestamp(start)]
+        if end is not None:
+            series = series[series.index <= pd.Timestamp(end)]
+        return series
+
+    @staticmethod
+    def _movements(df: pd.DataFrame) -> pd.DataFrame:
+        """Income, expense and investment per date (paise), sorted by date"""
+        if df.empty:
+            return pd.DataFrame(columns=FLOW_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=np.int64)
+        amounts = df[AMOUNT_PAISE_COLUMN].to_numpy()
+        categories = df["Category"].to_numpy(dtype=object)
+        flows = pd.DataFrame(
+            {name: np.where(categories == name, amounts, 0) for name in FLOW_COLUMNS},
+            index=pd.DatetimeIndex(df["Date"].to_numpy(), name="Date"),
+        )
+        return flows[flows.index.notna()].groupby(level=0).sum()
+
+    @staticmethod
+    def _accumulate(daily: pd.DataFrame) -> pd.DataFrame:
+        """Running rupee totals of daily movements"""
+        return pd.DataFrame({
+            BALANCE_COLUMN: to_rupees((daily["Income"] - daily["Expense"]).cumsum()),
+            INVESTED_COLUMN: to_rupees(daily["Investment"].cumsum()),
+        }, index=daily.index).astype(float)
+
+
+@st.cache_resource
+def get_balance_series_cache() -> AppendExtendableCache[BalanceSeries]:
+    """Get the process-wide balance series cache"""
+    return AppendExtendableCache(BalanceSeries.build, BalanceSeries.extend)
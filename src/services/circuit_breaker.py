@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import streamlit as st
+from config.config import Config
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling the backend while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing backend and probes it on a half-open schedule
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls
+    fail fast with CircuitOpenError. Once the reset timeout has passed a single
+    probe call is let through (half-open): success closes the circuit, failure
+    reopens it with the timeout doubled, up to ``max_reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, max_reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._reset_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._opened_wall_time: Optional[float] = None
+        self._probe_in_flight = False
+        self._last_error: Optional[str] = None
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the backend right now"""
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+                self._state = STATE_HALF_OPEN
+            if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+            self._opened_wall_time = None
+            self._last_error = None
+
+    def record_failure(self, error: Exception) -> None:
+        """Count a failure, opening (or reopening) the circuit when needed"""
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) or error.__class__.__name__
+
+            if self._state == STATE_HALF_OPEN:
+                self._reset_timeout = min(self._reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self._state == STATE_CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Free the probe slot of a call that ended without an outcome (e.g. a rerun interrupted it)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        if self._opened_wall_time is None:
+            self._opened_wall_time = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for display"""
+        with self._lock:
+            retry_in = 0.0
+            if self._state == STATE_OPEN:
+                retry_in = max(self._reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "last_error": self._last_error,
+                "down_since": self._opened_wall_time,
+                "retry_in_seconds": round(retry_in),
+            }
+
+
+@st.cache_resource
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the process-wide circuit breaker guarding Google Sheets"""
+    return CircuitBreaker(
+        failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=Config.CIRCUIT_RESET_SECONDS,
+        max_reset_timeout=Config.CIRCUIT_MAX_RESET_SECONDS
+    )
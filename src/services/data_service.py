@@ -1,129 +1,170 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Optional, List
 from src.services.google_sheets_service import GoogleSheetsService
+from src.services.storage_backend import create_storage_backend
+from src.services.sync_engine import get_sync_engine
+from src.services.rate_limiter import get_rate_limiter
+from src.services.dataset_cache import dataset_version, get_dataset_cache
+from src.services.aggregate_cube import AggregateCube, get_cube_cache
+from src.services.date_index import DateIndex, get_date_index_cache
+from src.services.leave_index import LeaveDays, get_leave_index
+from src.services.trend_engine import category_trend
+from src.services.balance_series import BalanceSeries, get_balance_series_cache
 from src.models.transaction import Transaction
+from src.models import ledger_schema
 from config.config import Config
 
 class DataService:
     """Service for managing transaction data operations"""
     
     def __init__(self):
-        self.sheets_service = GoogleSheetsService()
-        self._cache_buster = None
+        self.backend = create_storage_backend()
+        self.dataset_cache = get_dataset_cache()
+        self.cube_cache = get_cube_cache()
+        self.date_index_cache = get_date_index_cache()
+        self.balance_series_cache = get_balance_series_cache()
+        self.leave_index = get_leave_index()
+        self.read_only = False
     
-    @st.cache_data(ttl=Config.CACHE_TTL_MINUTES * 60)
-    def load_data_cached(_self, cache_buster=None) -> pd.DataFrame:
-        """Load data with caching"""
+    def load_data(self) -> pd.DataFrame:
+        """Load data stale-while-revalidate, falling back to the last good snapshot during outages"""
         try:
-            data = _self.sheets_service.get_all_records()
-            df = pd.DataFrame(data)
-            
-            if not df.empty:
-                # Convert Date column to datetime
-                df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-                # Remove any rows with invalid dates
-                df = df.dropna(subset=['Date'])
-                # Reset index
-                df = df.reset_index(drop=True)
-            
-            return df
+            return self.dataset_cache.get(self.backend.read_all)
             
         except Exception as e:
+            snapshot = self.backend.last_good_snapshot()
+            if snapshot is not None:
+                self.read_only = True
+                return snapshot.copy(deep=False)
+            
             st.error(f"❌ Error loading data: {str(e)}")
             return pd.DataFrame()
     
-    def load_data(self) -> pd.DataFrame:
-        """Load data with cache busting when new transactions are added"""
-        return self.load_data_cached(self._cache_buster)
-    
     def add_transaction(self, transaction: Transaction) -> tuple[bool, str]:
-        """Add a new transaction"""
+        """Record a new transaction locally; it is replayed to the sheet in the background"""
         try:
             if Config.get_debug_mode():
                 st.write(f"🔍 Debug: Adding transaction - {transaction}")
             
-            success, message = self.sheets_service.add_record(transaction.to_row())
+            rows = [GoogleSheetsService.stamp_row(transaction.to_row())]
+            row_ids = self.backend.append_batch(rows)
             
-            if success:
-                # Update cache buster to force data reload
-                self._cache_buster = datetime.now().isoformat()
-                # Clear cached data
-                self.load_data_cached.clear()
+            if Config.get_debug_mode():
+                st.write(f"🔍 Debug: Stored in {self.backend.name} backend as {row_ids[0]}")
             
-            return success, message
+            self._after_write([transaction], rows, row_ids)
+            return True, "Transaction saved successfully!"
             
         except Exception as e:
             return False, f"Error adding transaction: {str(e)}"
     
+    def get_pending_write_count(self) -> int:
+        """Number of recorded transactions not yet confirmed in the sheet"""
+        return self.backend.pending_write_count()
+    
+    def get_connection_status(self) -> dict:
+        """Circuit breaker state of the remote store"""
+        return self.backend.connection_status()
+    
+    def get_api_stats(self) -> dict:
+        """Sheets API call, throttling and retry counters"""
+        return get_rate_limiter().stats()
+    
+    def test_connection(self) -> tuple[bool, str]:
+        """Test the storage backend connection"""
+        return self.backend.test_connection()
+    
+    def is_available(self) -> bool:
+        """Whether the storage backend can currently serve reads"""
+        return self.backend.is_available()
+    
+    def _after_write(self, transactions: List[Transaction], rows: List[list], row_ids: List[str]) -> None:
+        """Show written rows immediately; reload only when they cannot be appended in place"""
+        for transaction in transactions:
+            if transaction.is_leave():
+                self.leave_index.add(transaction.date, transaction.subcategory)
+        if not self.dataset_cache.append(ledger_schema.rows_to_frame(rows, row_ids), row_ids):
+            self.dataset_cache.invalidate()
+    
+    def get_pending_row_ids(self) -> set:
+        """Row IDs of transactions shown before a load has confirmed them"""
+        return self.dataset_cache.pending_row_ids
+    
+    @property
+    def dataset_version(self) -> Optional[str]:
+        """Content address of the current ledger, shared by all sessions"""
+        return self.dataset_cache.version
+    
     def check_duplicate_leave(self, df: pd.DataFrame, date: datetime, subcategory: str) -> bool:
-        """Check if leave already exists for given date and person"""
-        if df.empty:
-            return False
-        
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-        selected_date = pd.to_datetime(date).date()
-        
-        duplicate = df[
-            (df["Category"] == "Leave") &
-            (df["Subcategory"] == subcategory) &
-            (df["Date"].dt.date == selected_date)
-        ]
-        
-        return not duplicate.empty
+        """Check if leave already exists (or was just recorded) for given date and person"""
+        self.leave_index.refresh(df, dataset_version(df))
+        return self.leave_index.contains(date, subcategory)
+    
+    def get_date_index(self, df: pd.DataFrame) -> DateIndex:
+        """Date-sorted month index of the loaded ledger, built once per dataset version"""
+        return self.date_index_cache.get(df, dataset_version(df))
+    
+    def get_available_years(self, df: pd.DataFrame) -> List[int]:
+        """Years that have entries, most recent first"""
+        return self.get_date_index(df).years()
+    
+    def get_available_months(self, df: pd.DataFrame, year: int) -> List[int]:
+        """Months of a year that have entries"""
+        return self.get_date_index(df).months(year)
     
     def get_monthly_data(self, df: pd.DataFrame, year: int, months: List[int]) -> pd.DataFrame:
         """Filter data for specific months and year"""
-        return df[(df["Date"].dt.month.isin(months)) & (df["Date"].dt.year == year)]
+        return self.get_date_index(df).months_slice(year, months)
     
-    def get_category_totals(self, df: pd.DataFrame) -> dict:
-        """Calculate totals by category"""
-        return {
-            'income': df[df["Category"] == "Income"]["Amount (₹)"].sum(),
-            'expense': df[df["Category"] == "Expense"]["Amount (₹)"].sum(),
-            'investment': df[df["Category"] == "Investment"]["Amount (₹)"].sum(),
-            'expense_shubham': df[(df["Category"] == "Expense") & (df["Paid by"] == "Shubham")]["Amount (₹)"].sum(),
-            'expense_yashika': df[(df["Category"] == "Expense") & (df["Paid by"] == "Yashika")]["Amount (₹)"].sum(),
-        }
+    def get_cube(self, df: pd.DataFrame) -> AggregateCube:
+        """Aggregate cube of the loaded ledger, built once per dataset version"""
+        return self.cube_cache.get(df, dataset_version(df))
     
-    def get_monthly_trend(self, df: pd.DataFrame, category: str, months: int = 6) -> pd.DataFrame:
-        """Get monthly trend data for a category"""
-        today = datetime.today()
-        start_month = today.month - months
-        start_year = today.year
-        if start_month <= 0:
-            start_month += 12
-            start_year -= 1
-
-        # Get data from (start_year, start_month) onward
-        df = df[df["Date"] >= datetime(start_year, start_month, 1)]
-        df = df[df["Category"] == category]
-
-        if df.empty:
-            return pd.DataFrame()
-
-        # Group by Year+Month and sum
-        df["YearMonth"] = df["Date"].dt.to_period("M")
-        trend_df = df.groupby("YearMonth")["Amount (₹)"].sum().reset_index()
-        trend_df["YearMonth"] = trend_df["YearMonth"].astype(str)
-        trend_df["YearMonth"] = trend_df["YearMonth"].apply(lambda x: pd.to_datetime(x).strftime("%b %Y"))
-
-        return trend_df
+    def get_category_totals(self, df: pd.DataFrame, year: Optional[int] = None,
+                            months: Optional[List[int]] = None) -> dict:
+        """Calculate totals by category for a period (all time when no year is given)"""
+        return self.get_cube(df).totals(year, months)
+    
+    def get_category_breakdown(self, df: pd.DataFrame, category: str, year: Optional[int] = None,
+                               months: Optional[List[int]] = None) -> pd.Series:
+        """Amount per subcategory of a category for a period"""
+        return self.get_cube(df).breakdown(category, year, months)
+    
+    def get_monthly_trend(self, df: pd.DataFrame, category: str,
+                          window: str = Config.DEFAULT_TREND_WINDOW) -> pd.DataFrame:
+        """Get monthly trend data for a category over a window (see Config.TREND_WINDOWS)"""
+        return category_trend(self.get_cube(df), category, window)
+    
+    def get_daily_totals(self, df: pd.DataFrame, year: int, category: str) -> np.ndarray:
+        """Rupee total of a category for each day of a year (366 slots, index 0 is 1 January)"""
+        return self.get_cube(df).daily_totals(year).get(category, np.zeros(366))
+    
+    def get_balance_series(self, df: pd.DataFrame) -> BalanceSeries:
+        """Daily running balance and cumulative investment, extended as rows are appended"""
+        return self.balance_series_cache.get(df, dataset_version(df))
+    
+    def get_leave_days(self, df: pd.DataFrame) -> LeaveDays:
+        """Per-person leave day bitmap, built once per dataset version"""
+        return self.leave_index.days(df, dataset_version(df))
     
     def get_leave_summary(self, df: pd.DataFrame, year: int, month: int) -> dict:
         """Get leave summary for a specific month"""
-        leave_data = df[(df["Date"].dt.year == year) & 
-                       (df["Date"].dt.month == month) & 
-                       (df["Category"] == "Leave")]
+        leave_days = self.get_leave_days(df).month(year, month)
         
         return {
-            'maid_leaves': len(leave_data[leave_data["Subcategory"] == "Maid"]),
-            'cook_leaves': len(leave_data[leave_data["Subcategory"] == "Cook"]),
-            'leave_data': leave_data
+            'maid_leaves': int(leave_days["Maid"].sum()) if "Maid" in leave_days else 0,
+            'cook_leaves': int(leave_days["Cook"].sum()) if "Cook" in leave_days else 0,
+            'leave_days': leave_days
         }
     
     def clear_cache(self) -> None:
         """Clear all cached data"""
-        self.load_data_cached.clear()
-        self._cache_buster = None
\ No newline at end of file
+        self.dataset_cache.clear()
+        self.cube_cache.clear()
+        self.date_index_cache.clear()
+        self.balance_series_cache.clear()
+        self.leave_index.clear()
+        get_sync_engine().reset()
\ No newline at end of file
@@ -0,0 +1,296 @@
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+import pandas as pd
+import streamlit as st
+from config.config import Config
+from src.models import ledger_schema
+from src.services.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_READ
+from src.utils.single_flight import SingleFlight
+
+# Frame attribute carrying the dataset version the frame was published under
+VERSION_ATTR = "dataset_version"
+# Frame attribute mapping earlier versions to their row count, for every earlier
+# version whose frame is exactly the first rows of this one (rows were only appended)
+LINEAGE_ATTR = "dataset_lineage"
+# Earlier versions remembered per frame
+MAX_LINEAGE = 8
+
+# Attributes a loader may set on the frames it returns: an ID for the frame and,
+# when the frame is a previously returned one plus appended rows, that frame's ID
+LOAD_ID_ATTR = "load_id"
+LOAD_PARENT_ATTR = "load_parent"
+
+
+def dataset_version(df: pd.DataFrame) -> str:
+    """Content address of a ledger frame: its row count plus a hash of its rows
+
+    Frames published by the cache carry their version; any other frame (for
+    example an outage snapshot) is fingerprinted on the spot over all of
+    its rows.
+    """
+    version = df.attrs.get(VERSION_ATTR)
+    if version is not None:
+        return version
+    return _address(df, None, 0)
+
+
+def _address(df: pd.DataFrame, parent: Optional[str], parent_rows: int) -> str:
+    """Hash of the rows after ``parent_rows``, chained onto the parent version if there is one"""
+    digest = hashlib.sha1()
+    if parent is not None:
+        digest.update(parent.encode("utf-8"))
+    rows = df.iloc[parent_rows:]
+    if not rows.empty:
+        digest.update(",".join(map(str, rows.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    return f"{len(df)}-{digest.hexdigest()[:12]}"
+
+
+def dataset_lineage(df: pd.DataFrame) -> Dict[str, int]:
+    """Earlier dataset versions this frame only appends to, with their row counts"""
+    return df.attrs.get(LINEAGE_ATTR, {})
+
+
+class _LoadedBase(NamedTuple):
+    """The last loaded frame that was published as is"""
+    load_id: Any
+    version: str
+    lineage: Dict[str, int]
+    rows: int
+
+
+class DatasetCache:
+    """Stale-while-revalidate cache for the loaded ledger
+
+    The ledger is held once per process, frozen (see ledger_schema.freeze),
+    and every caller gets a zero-copy view of it, so memory stays flat as
+    sessions are added.
+
+    Within ``fresh_seconds`` the cached frame is returned as is. After that the
+    stale frame is still returned immediately while a background thread
+    reloads it, passing PRIORITY_BACKGROUND to the loader so the reload
+    yields to interactive reads. Only the very first load, an explicit invalidation, or data
+    older than ``max_stale_seconds`` make the caller wait for the loader.
+    ``version`` is the content address of the cached frame (see
+    dataset_version), shared by every session in the process: it changes
+    exactly when the data does, so sessions and derived caches keyed on it
+    refresh only when needed. ``loads`` counts publications and keys the
+    single-flight fetches.
+
+    Rows we write ourselves are appended to the cached frame straight away
+    and kept as pending (by row ID) until a load contains them; until then
+    they are re-applied on top of every reloaded frame.
+
+    Each published frame records which earlier versions it merely appends
+    to (see dataset_lineage): our own appends always do, and so does a
+    reload whose loader marks it as its previous frame plus new rows.
+    Derived caches use this to extend instead of rebuilding.
+    """
+
+    def __init__(self, fresh_seconds: float, max_stale_seconds: float):
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._lock = threading.Lock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._loaded_at = 0.0
+        self._must_reload = False
+        self._refreshing = False
+        self._generation = 0
+        self.version: Optional[str] = None
+        self.loads = 0
+        self.last_refresh_error: Optional[str] = None
+        self.flight = SingleFlight()
+        self._pending: Dict[str, pd.DataFrame] = {}
+        self._base: Optional[_LoadedBase] = None
+
+    def get(self, loader: Callable[[int], pd.DataFrame]) -> pd.DataFrame:
+        """Return the cached frame, revalidating it in the background when stale
+
+        ``loader`` is called with the rate limiter priority to read at.
+        """
+        with self._lock:
+            frame = self._frame
+            version = (self.loads, self._generation)
+            age = time.monotonic() - self._loaded_at
+            blocking = frame is None or self._must_reload or age >= self.max_stale_seconds
+            refresh = not blocking and age >= self.fresh_seconds and not self._refreshing
+            if refresh:
+                self._refreshing = True
+
+        if blocking:
+            return self._view(self._load(loader, version, PRIORITY_READ))
+
+        if refresh:
+            threading.Thread(target=self._refresh, args=(loader, version), name="dataset-revalidate", daemon=True).start()
+
+        return self._view(frame)
+
+    def invalidate(self) -> None:
+        """Make the next get() wait for a reload (used right after our own writes)"""
+        with self._lock:
+            self._must_reload = True
+            # Fetches started before our write must not satisfy the reload
+            self._generation += 1
+
+    def append(self, rows: pd.DataFrame, row_ids: List[str]) -> bool:
+        """Optimistically add just-written rows to the cached frame
+
+        Returns False when the rows cannot be applied safely (nothing cached
+        yet, a reload already pending, or the row IDs are already present);
+        the caller should then invalidate instead.
+        """
+        with self._lock:
+            frame = self._frame
+            if frame is None or self._must_reload or self._contains(frame, row_ids):
+                return False
+            if "Row ID" not in frame.columns:
+                # Sheets written before row IDs existed have no such column yet
+                frame = frame.assign(**{"Row ID": ""})
+            for row_id, row in zip(row_ids, self._split(rows)):
+                self._pending[row_id] = row
+            self._publish(ledger_schema.concat(frame, self._align(rows, frame)), self._descend(self._frame))
+            return True
+
+    @property
+    def pending_row_ids(self) -> Set[str]:
+        """Row IDs shown optimistically but not yet confirmed by a load"""
+        with self._lock:
+            return set(self._pending)
+
+    def clear(self) -> None:
+        """Drop the cached frame entirely"""
+        with self._lock:
+            self._frame = None
+            self._loaded_at = 0.0
+            self._must_reload = False
+            self._base = None
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        """Seconds since the cached frame was loaded"""
+        return None if self._frame is None else time.monotonic() - self._loaded_at
+
+    def _load(self, loader: Callable[[int], pd.DataFrame], seen_version: tuple, priority: int) -> pd.DataFrame:
+        """Fetch once per dataset version no matter how many callers miss together"""
+        def fetch() -> pd.DataFrame:
+            with self._lock:
+                # Another flight already replaced the version this caller missed on
+                if self.loads != seen_version[0] and not self._must_reload and self._frame is not None:
+                    return self._frame
+            return self._store(loader(priority))
+
+        return self.flight.do(("ledger",) + seen_version, fetch)
+
+    def _store(self, frame: pd.DataFrame) -> pd.DataFrame:
+        with self._lock:
+            load_id = frame.attrs.get(LOAD_ID_ATTR)
+            base = self._base
+            # The loaded frame is the base frame, or the base frame plus appended rows
+            extends_base = base is not None and load_id is not None and base.load_id in (
+                load_id, frame.attrs.get(LOAD_PARENT_ATTR)
+            )
+            lineage = self._descend_from(base.version, base.lineage, base.rows) if extends_base else {}
+            loaded_rows = len(frame)
+            frame = self._publish(self._reconcile(frame), lineage)
+            if len(frame) == loaded_rows:
+                self._base = _LoadedBase(load_id, self.version, lineage, loaded_rows) if load_id is not None else None
+            elif not extends_base or base.load_id != load_id:
+                # Pending rows were re-applied on top of a frame that was never published alone
+                self._base = None
+            self._loaded_at = time.monotonic()
+            self._must_reload = False
+            self.last_refresh_error = None
+        return frame
+
+    def _publish(self, frame: pd.DataFrame, lineage: Dict[str, int]) -> pd.DataFrame:
+        """Make a frame the cached one, stamped with its content version and lineage (lock held)"""
+        frame = ledger_schema.freeze(frame.copy(deep=False))
+        # Frames derived from a published one inherit its attrs; always re-address
+        frame.attrs.clear()
+        frame.attrs[VERSION_ATTR] = self._address_of(frame, lineage)
+        frame.attrs[LINEAGE_ATTR] = {
+            version: rows for version, rows in lineage.items() if version != frame.attrs[VERSION_ATTR]
+        }
+        self._frame = frame
+        self.version = frame.attrs[VERSION_ATTR]
+        self.loads += 1
+        return frame
+
+    def _refresh(self, loader: Callable[[int], pd.DataFrame], seen_version: tuple) -> None:
+        """Background revalidation; on failure the stale frame stays in place"""
+        try:
+            self._load(loader, seen_version, PRIORITY_BACKGROUND)
+        except Exception as e:
+            self.last_refresh_error = str(e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _reconcile(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Confirm pending rows the loaded frame contains and re-apply the rest"""
+        if not self._pending:
+            return frame
+        loaded = set(frame["Row ID"].astype(str)) if "Row ID" in frame.columns else set()
+        for row_id in loaded & set(self._pending):
+            del self._pending[row_id]
+        if not self._pending:
+            return frame
+        rows = pd.concat(list(self._pending.values()), ignore_index=True)
+        return ledger_schema.concat(frame, self._align(rows, frame)) if not frame.empty else rows
+
+    @staticmethod
+    def _address_of(frame: pd.DataFrame, lineage: Dict[str, int]) -> str:
+        """Version of a frame: its parent's plus the appended rows, or a hash of every row
+
+        Only the rows after the parent are hashed, which the lineage proves
+        are the only ones that changed; a frame without lineage (a full
+        reload) is hashed in full, so edits anywhere in it change the version.
+        """
+        if not lineage:
+            return _address(frame, None, 0)
+        parent, parent_rows = next(reversed(lineage.items()))
+        if parent_rows == len(frame):
+            return parent
+        return _address(frame, parent, parent_rows)
+
+    @classmethod
+    def _descend(cls, frame: pd.DataFrame) -> Dict[str, int]:
+        """Lineage of a frame that appends rows to the given published frame"""
+        return cls._descend_from(frame.attrs[VERSION_ATTR], dataset_lineage(frame), len(frame))
+
+    @staticmethod
+    def _descend_from(version: str, lineage: Dict[str, int], rows: int) -> Dict[str, int]:
+        descended = dict(lineage)
+        descended.pop(version, None)
+        descended[version] = rows
+        return dict(list(descended.items())[-MAX_LINEAGE:])
+
+    @staticmethod
+    def _contains(frame: pd.DataFrame, row_ids: List[str]) -> bool:
+        return "Row ID" in frame.columns and bool(frame["Row ID"].isin(row_ids).any())
+
+    @staticmethod
+    def _align(rows: pd.DataFrame, frame: pd.DataFrame) -> pd.DataFrame:
+        """Give appended rows the cached frame's columns"""
+        return rows if frame.empty else rows.reindex(columns=frame.columns)
+
+    @staticmethod
+    def _split(rows: pd.DataFrame) -> List[pd.DataFrame]:
+        return [rows.iloc[position:position + 1] for position in range(len(rows))]
+
+    @staticmethod
+    def _view(frame: pd.DataFrame) -> pd.DataFrame:
+        """Hand out a read-only shallow view; column assignments stay local to the caller"""
+        return frame.copy(deep=False)
+
+
+@st.cache_resource
+def get_dataset_cache() -> DatasetCache:
+    """Get the process-wide ledger cache"""
+    return DatasetCache(
+        fresh_seconds=Config.CACHE_TTL_MINUTES * 60,
+        max_stale_seconds=Config.CACHE_MAX_STALENESS_MINUTES * 60
+    )
@@ -0,0 +1,101 @@
+import threading
+from typing import Any, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+class DateIndex:
+    """Date-sorted view of the ledger with precomputed month partition offsets
+
+    Rows are kept in date order (the frame is only reordered when it is not
+    already sorted), and for every month present the offsets of its first
+    and last row are stored. A slice of consecutive months is then a binary
+    search plus a positional slice, which is a view rather than a copy.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        dates = df["Date"].to_numpy() if "Date" in df.columns else np.array([], dtype="datetime64[ns]")
+        if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+            order = np.argsort(dates, kind="stable")
+            df = df.take(order)
+            dates = dates[order]
+
+        self.frame = df
+        # Months since the epoch; sorted dates give sorted keys, so unique() yields partition offsets
+        month_keys = dates.astype("datetime64[M]").astype(np.int64)
+        self.month_keys, self.month_starts = np.unique(month_keys, return_index=True)
+        self.month_ends = np.append(self.month_starts[1:], len(dates)).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def years(self) -> List[int]:
+        """Years with at least one entry, most recent first"""
+        return sorted({int(key) // 12 + 1970 for key in self.month_keys}, reverse=True)
+
+    def months(self, year: int) -> List[int]:
+        """Months of a year with at least one entry"""
+        first = (year - 1970) * 12
+        lo, hi = np.searchsorted(self.month_keys, [first, first + 12])
+        return [int(key) - first + 1 for key in self.month_keys[lo:hi]]
+
+    def months_slice(self, year: int, months: Iterable[int]) -> pd.DataFrame:
+        """Rows of the given months of a year; one view when the months are consecutive"""
+        months = sorted(set(int(month) for month in months))
+        if not months:
+            return self.frame.iloc[0:0]
+
+        # Merge consecutive months into runs so each run is a single slice
+        runs = []
+        for month in months:
+            if runs and runs[-1][1] == month - 1:
+                runs[-1][1] = month
+            else:
+                runs.append([month, month])
+
+        first = (year - 1970) * 12 - 1
+        slices = [self._span(first + start, first + end) for start, end in runs]
+        slices = [(lo, hi) for lo, hi in slices if hi > lo]
+        if len(slices) <= 1:
+            lo, hi = slices[0] if slices else (0, 0)
+            return self.frame.iloc[lo:hi]
+        return pd.concat([self.frame.iloc[lo:hi] for lo, hi in slices])
+
+    def _span(self, first_key: int, last_key: int) -> tuple:
+        """Row offsets covering the months first_key..last_key (inclusive)"""
+        lo, hi = np.searchsorted(self.month_keys, [first_key, last_key + 1])
+        if lo >= hi:
+            return 0, 0
+        return int(self.month_starts[lo]), int(self.month_ends[hi - 1])
+
+
+class DateIndexCache:
+    """Keeps the date index of the current dataset version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[DateIndex] = None
+        self._version: Any = None
+        self.builds = 0
+
+    def get(self, df: pd.DataFrame, version: Any) -> DateIndex:
+        """The date index for this frame, built once per dataset version"""
+        with self._lock:
+            if self._index is None or version != self._version:
+                self._index = DateIndex(df)
+                self._version = version
+                self.builds += 1
+            return self._index
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = None
+            self._version = None
+
+
+@st.cache_resource
+def get_date_index_cache() -> DateIndexCache:
+    """Get the process-wide date index cache"""
+    return DateIndexCache()
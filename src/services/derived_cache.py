@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Optional, Tuple, TypeVar
+
+import pandas as pd
+from src.services.dataset_cache import dataset_lineage
+
+T = TypeVar("T")
+
+
+class AppendExtendableCache(Generic[T]):
+    """Keeps a value derived from the ledger per dataset version, extending it when rows are only appended
+
+    A value is extended only when the frame's lineage (see
+    dataset_cache.dataset_lineage) states that it is a cached version plus
+    appended rows; everything else, including edits to earlier rows, is
+    built from scratch. The last few versions are kept, so a frame that
+    extends an older version than the latest (e.g. a reload landing after
+    our own optimistic append) still only folds in its new rows.
+    """
+
+    def __init__(self, build: Callable[[pd.DataFrame], T], extend: Callable[[T, pd.DataFrame], T], keep: int = 4):
+        self._build = build
+        self._extend = extend
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._values: "OrderedDict[Any, Tuple[T, int]]" = OrderedDict()
+        self.builds = 0
+        self.extensions = 0
+
+    def get(self, df: pd.DataFrame, version: Any) -> T:
+        """The value for this frame, built in full only when it does not extend a cached version"""
+        with self._lock:
+            entry = self._values.get(version)
+            if entry is not None:
+                self._values.move_to_end(version)
+                return entry[0]
+
+            base = self._ancestor(df)
+            if base is not None:
+                value = self._extend(base[0], df.iloc[base[1]:])
+                self.extensions += 1
+            else:
+                value = self._build(df)
+                self.builds += 1
+
+            self._values[version] = (value, len(df))
+            while len(self._values) > self.keep:
+                self._values.popitem(last=False)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _ancestor(self, df: pd.DataFrame) -> Optional[Tuple[T, int]]:
+        """The cached value of the longest earlier version this frame appends to"""
+        best: Optional[Tuple[T, int]] = None
+        for version, rows in dataset_lineage(df).items():
+            entry = self._values.get(version)
+            if entry is not None and entry[1] == rows <= len(df) and (best is None or rows > best[1]):
+                best = entry
+        return best
@@ -1,11 +1,15 @@
 import streamlit as st
 import gspread
 from google.oauth2.service_account import Credentials
-from typing import Optional, List, Dict, Any
-import time
+from gspread.utils import DateTimeOption, Dimension, ValueRenderOption, rowcol_to_a1
+from typing import Optional, List, Dict, Any, Callable, Set
 from datetime import datetime
 import pytz
 from config.config import Config
+from src.models.ledger_schema import new_row_id
+from src.services.worksheet_pool import WorksheetPool, get_worksheet_pool
+from src.services.rate_limiter import PRIORITY_READ, PRIORITY_WRITE, get_rate_limiter
+from src.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
 
 class GoogleSheetsService:
     """Service for managing Google Sheets operations"""
@@ -13,6 +17,9 @@ class GoogleSheetsService:
     def __init__(self):
         self.client = None
         self.worksheet = None
+        self.pool = get_worksheet_pool()
+        self.limiter = get_rate_limiter()
+        self.breaker = get_circuit_breaker()
         self._connect()
     
     @st.cache_resource(ttl=Config.CACHE_TTL_HOURS * 3600)
@@ -44,21 +51,87 @@ class GoogleSheetsService:
         """Establish connection to Google Sheets"""
         self.client = self._get_client()
     
+    def _refresh_connection(self, error: Exception) -> None:
+        """Drop pooled handles (and the client on auth expiry) after a stale-handle error"""
+        self.pool.invalidate(Config.SPREADSHEET_NAME, forget_key=True)
+        
+        if getattr(getattr(error, "response", None), "status_code", None) == 401:
+            self._get_client.clear()
+            self._connect()
+        
+        if Config.get_debug_mode():
+            st.write(f"🔍 Debug: Refreshing worksheet handle after error: {str(error)}")
+    
+    def _open_worksheet(self) -> gspread.Worksheet:
+        """Get the pooled worksheet, raising on failure"""
+        return self.pool.get(self.client, Config.SPREADSHEET_NAME, Config.WORKSHEET_NAME, self.limiter)
+    
+    def _guarded(self, call: Callable[[], Any]) -> Any:
+        """Run a backend call through the circuit breaker, failing fast while it is open"""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Google Sheets is unavailable, skipping call until the next probe")
+        
+        settled = False
+        try:
+            result = call()
+            self.breaker.record_success()
+            settled = True
+            return result
+        except Exception as e:
+            self.breaker.record_failure(e)
+            settled = True
+            raise
+        finally:
+            # Streamlit's rerun and stop exceptions are BaseExceptions; without an
+            # outcome the half-open probe must still be released or it never closes
+            if not settled:
+                self.breaker.release_probe()
+    
+    def _with_worksheet(self, operation: Callable[[gspread.Worksheet], Any], kind: str = "read",
+                        priority: int = PRIORITY_READ, max_retries: int = 5) -> Any:
+        """
+        Run an operation on the pooled worksheet through the circuit breaker and rate limiter
+        
+        Transient errors are retried with backoff by the limiter; a stale handle
+        is refreshed once.
+        """
+        return self._guarded(lambda: self._run_on_worksheet(operation, kind, priority, max_retries))
+    
+    def _run_on_worksheet(self, operation: Callable[[gspread.Worksheet], Any], kind: str,
+                          priority: int, max_retries: int) -> Any:
+        """Run an operation on the pooled worksheet, refreshing the handle once if it went stale"""
+        if self.client is None:
+            raise ConnectionError("Could not connect to Google Sheets")
+        
+        ws = self._open_worksheet()
+        try:
+            return self.limiter.call(lambda: operation(ws), kind, priority, max_retries)
+        except gspread.exceptions.APIError as e:
+            if not WorksheetPool.is_stale_handle_error(e):
+                raise
+            self._refresh_connection(e)
+            if self.client is None:
+                raise
+            ws = self._open_worksheet()
+            return self.limiter.call(lambda: operation(ws), kind, priority, max_retries)
+    
     def get_worksheet(self) -> Optional[gspread.Worksheet]:
         """Get worksheet instance"""
         try:
             if self.client is None:
                 return None
             
-            sheet = self.client.open(Config.SPREADSHEET_NAME)
-            ws = sheet.worksheet(Config.WORKSHEET_NAME)
+            ws = self._guarded(self._open_worksheet)
             
             if Config.get_debug_mode():
                 st.write("🔍 Debug: Successfully connected to spreadsheet and worksheet")
             
             return ws
             
+        except CircuitOpenError:
+            return None
         except gspread.SpreadsheetNotFound:
+            self.pool.invalidate(Config.SPREADSHEET_NAME, forget_key=True)
             st.error(f"❌ Spreadsheet '{Config.SPREADSHEET_NAME}' not found. Please check the name and sharing permissions.")
             return None
         except gspread.WorksheetNotFound:
@@ -75,7 +148,7 @@ class GoogleSheetsService:
             if ws is None:
                 return []
             
-            data = ws.get_all_records()
+            data = self._with_worksheet(lambda worksheet: worksheet.get_all_records())
             
             if Config.get_debug_mode():
                 st.write(f"🔍 Debug: Loaded {len(data)} records from sheet")
@@ -86,6 +159,26 @@ class GoogleSheetsService:
             st.error(f"❌ Error loading data: {str(e)}")
             return []
     
+    def get_columns(self, range_name: Optional[str] = None, priority: int = PRIORITY_READ) -> List[List[Any]]:
+        """Get a range (default: the whole sheet) column by column, raising on failure
+
+        Values come back unformatted - numbers as numbers and dates as serial
+        day counts - so they can be typed without any string parsing.
+        """
+        return self._with_worksheet(
+            lambda worksheet: worksheet.get(
+                range_name,
+                major_dimension=Dimension.cols,
+                value_render_option=ValueRenderOption.unformatted,
+                date_time_render_option=DateTimeOption.serial_number
+            ),
+            priority=priority
+        )
+    
+    def get_range_values(self, range_name: str, priority: int = PRIORITY_READ) -> List[List[Any]]:
+        """Get the rows of an A1 range from the worksheet, raising on failure"""
+        return self._with_worksheet(lambda worksheet: worksheet.get(range_name), priority=priority)
+    
     def add_record(self, row_data: List[Any], max_retries: int = 3, 
                    include_timestamp: bool = True, timestamp_format: str = "%Y-%m-%d %H:%M:%S",
                    timezone: str = "Asia/Kolkata") -> tuple[bool, str]:
@@ -120,29 +213,16 @@ class GoogleSheetsService:
             if Config.get_debug_mode():
                 st.write(f"🔍 Debug: Row data prepared: {row_data_with_timestamp}")
             
-            # Retry logic for robust insertion
-            for attempt in range(max_retries):
-                try:
-                    if Config.get_debug_mode():
-                        st.write(f"🔍 Debug: Attempt {attempt + 1} to add row...")
-                    
-                    result = ws.append_row(row_data_with_timestamp, value_input_option='USER_ENTERED')
-                    
-                    if Config.get_debug_mode():
-                        st.write(f"🔍 Debug: Sheet response: {result}")
-                    
-                    return True, "Transaction added successfully!"
-                    
-                except Exception as retry_error:
-                    if Config.get_debug_mode():
-                        st.write(f"🔍 Debug: Attempt {attempt + 1} failed: {str(retry_error)}")
-                    
-                    if attempt == max_retries - 1:
-                        raise retry_error
-                    
-                    time.sleep(1)
-            
-            return False, "Failed after all retry attempts"
+            # The rate limiter retries 429/5xx responses with jittered backoff
+            result = self._with_worksheet(
+                lambda worksheet: worksheet.append_row(row_data_with_timestamp, value_input_option='USER_ENTERED'),
+                kind="write", priority=PRIORITY_WRITE, max_retries=max_retries
+            )
+            
+            if Config.get_debug_mode():
+                st.write(f"🔍 Debug: Sheet response: {result}")
+            
+            return True, "Transaction added successfully!"
             
         except gspread.exceptions.APIError as e:
             error_msg = f"Google Sheets API Error: {str(e)}"
@@ -154,6 +234,100 @@ class GoogleSheetsService:
             error_msg = f"Unexpected error: {str(e)}"
             return False, error_msg
     
+    @staticmethod
+    def row_id_column_range() -> str:
+        """A1 range covering the row ID column below the header"""
+        letter = rowcol_to_a1(1, Config.ROW_ID_COLUMN_INDEX + 1).rstrip("0123456789")
+        return f"{letter}2:{letter}"
+    
+    def get_row_ids(self, priority: int = PRIORITY_READ) -> Set[str]:
+        """Row IDs present in the sheet, raising on failure"""
+        values = self.get_range_values(self.row_id_column_range(), priority=priority)
+        return {str(row[0]) for row in values if row}
+    
+    def find_sheet_row(self, row_id: str, priority: int = PRIORITY_READ) -> Optional[int]:
+        """Locate the 1-based sheet row number of a row ID, raising on failure"""
+        values = self.get_range_values(self.row_id_column_range(), priority=priority)
+        for offset, value in enumerate(values):
+            if value and str(value[0]) == row_id:
+                return offset + 2
+        return None
+    
+    def update_row_values(self, sheet_row: int, values: List[Any]) -> None:
+        """Overwrite a sheet row (1-based, header is row 1), raising on failure"""
+        end = rowcol_to_a1(sheet_row, len(values))
+        self._with_worksheet(
+            lambda worksheet: worksheet.update(f"A{sheet_row}:{end}", [values], value_input_option='USER_ENTERED'),
+            kind="write", priority=PRIORITY_WRITE
+        )
+    
+    def fill_missing_row_ids(self) -> int:
+        """Write a fresh row ID into every data row that has none, raising on failure
+
+        Rows written before row IDs existed can only be updated or deleted by
+        ID once they carry one. Returns the number of IDs written.
+        """
+        letter = rowcol_to_a1(1, Config.ROW_ID_COLUMN_INDEX + 1).rstrip("0123456789")
+        columns = self.get_columns(f"A2:{letter}")
+        fields = columns[:Config.ROW_ID_COLUMN_INDEX]
+        row_ids = columns[Config.ROW_ID_COLUMN_INDEX] if len(columns) > Config.ROW_ID_COLUMN_INDEX else []
+
+        updates = []
+        for offset in range(max((len(column) for column in columns), default=0)):
+            has_data = any(offset < len(column) and column[offset] != "" for column in fields)
+            has_id = offset < len(row_ids) and str(row_ids[offset]).strip() != ""
+            if has_data and not has_id:
+                updates.append({"range": f"{letter}{offset + 2}", "values": [[new_row_id()]]})
+
+        if updates:
+            self._with_worksheet(
+                lambda worksheet: worksheet.batch_update(updates, value_input_option='RAW'),
+                kind="write", priority=PRIORITY_WRITE
+            )
+        return len(updates)
+    
+    def delete_sheet_row(self, sheet_row: int) -> None:
+        """Delete a sheet row (1-based, header is row 1), raising on failure"""
+        self._with_worksheet(lambda worksheet: worksheet.delete_rows(sheet_row), kind="write", priority=PRIORITY_WRITE)
+    
+    @staticmethod
+    def stamp_row(row_data: List[Any], timestamp_format: str = "%Y-%m-%d %H:%M:%S",
+                  timezone: str = "Asia/Kolkata") -> List[Any]:
+        """Append the current time in the given timezone to a row"""
+        tz = pytz.timezone(timezone)
+        return row_data + [datetime.now(tz).strftime(timestamp_format)]
+    
+    def append_rows(self, rows: List[List[Any]], max_retries: int = 3) -> tuple[bool, str]:
+        """
+        Append several already-timestamped rows with a single API call
+        
+        Safe to call from background threads: it never writes to the page.
+        
+        Args:
+            rows: List of rows to append, in order
+            max_retries: Number of retry attempts for API calls
+        """
+        if not rows:
+            return True, "Nothing to add"
+        
+        try:
+            if self.client is None:
+                return False, "Could not connect to worksheet"
+            
+            self._with_worksheet(
+                lambda worksheet: worksheet.append_rows(rows, value_input_option='USER_ENTERED'),
+                kind="write", priority=PRIORITY_WRITE, max_retries=max_retries
+            )
+            noun = "Transaction" if len(rows) == 1 else f"{len(rows)} transactions"
+            return True, f"{noun} added successfully!"
+            
+        except gspread.exceptions.APIError as e:
+            return False, f"Google Sheets API Error: {str(e)}"
+        except ValueError as e:
+            return False, f"Value Error (check amount format): {str(e)}"
+        except Exception as e:
+            return False, f"Unexpected error: {str(e)}"
+    
     def add_record_with_custom_timestamp(self, row_data: List[Any], 
                                        custom_timestamp: Optional[datetime] = None,
                                        timestamp_format: str = "%Y-%m-%d %H:%M:%S",
@@ -192,10 +366,11 @@ class GoogleSheetsService:
             if not ws:
                 return False, "Connection failed"
             
-            headers = ws.row_values(1)
-            all_values = ws.get_all_values()
+            headers = self._with_worksheet(lambda worksheet: worksheet.row_values(1))
+            first_column = self.get_columns("A:A")
+            rows = len(first_column[0]) if first_column else 0
             
-            return True, f"Connection successful! Headers: {headers}, Rows: {len(all_values)}"
+            return True, f"Connection successful! Headers: {headers}, Rows: {rows}"
             
         except Exception as e:
             return False, f"Connection test failed: {e}"
\ No newline at end of file
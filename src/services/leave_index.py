@@ -0,0 +1,122 @@
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from src.utils.month_layout import month_layout
+
+LeaveKey = Tuple[date, str]
+
+
+class LeaveDays:
+    """Per-person leave bitmap over every day of every year with leave
+
+    ``bitmap[year, person, day_of_year]`` is set when the person was on
+    leave that day. It is filled in one vectorized pass over the leave rows;
+    a month or a year is then a slice, and counts are sums over it.
+    """
+
+    def __init__(self, dates: np.ndarray, people: np.ndarray):
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        valid = ~np.isnat(dates)
+        dates, people = dates[valid], np.asarray(people, dtype=str)[valid]
+        year_starts = dates.astype("datetime64[Y]")
+        day_of_year = (dates - year_starts.astype("datetime64[D]")).astype(np.int64)
+
+        years, year_positions = np.unique(year_starts.astype(np.int64) + 1970, return_inverse=True)
+        people, person_positions = np.unique(people, return_inverse=True)
+        bitmap = np.zeros((len(years), len(people), 366), dtype=bool)
+        bitmap[year_positions, person_positions, day_of_year] = True
+        bitmap.flags.writeable = False
+
+        self.years = years
+        self.people = [str(person) for person in people]
+        self.bitmap = bitmap
+
+    @classmethod
+    def empty(cls) -> "LeaveDays":
+        return cls(np.array([], dtype="datetime64[D]"), np.array([], dtype=str))
+
+    def year(self, year: int) -> Dict[str, np.ndarray]:
+        """Leave per person for each day of a year (index 0 is 1 January)"""
+        position = int(np.searchsorted(self.years, year))
+        if position == len(self.years) or self.years[position] != year:
+            return {}
+        return dict(zip(self.people, self.bitmap[position]))
+
+    def month(self, year: int, month: int) -> Dict[str, np.ndarray]:
+        """Leave per person for each day of a month (index 0 is the 1st)"""
+        layout = month_layout(year, month)
+        start, end = layout.year_offset, layout.year_offset + layout.days_in_month
+        return {person: days[start:end] for person, days in self.year(year).items()}
+
+
+class LeaveIndex:
+    """Hash index of (date, person) leave entries for O(1) duplicate checks
+
+    The loaded entries are rebuilt once per dataset version. Leave recorded
+    through this process is also kept as pending until a loaded dataset
+    contains it, so a second submission is caught even before the write has
+    reached the sheet and the cache has refreshed. The same refresh also
+    builds the leave day bitmap used by the calendar and the leave metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded: Set[LeaveKey] = set()
+        self._pending: Set[LeaveKey] = set()
+        self._days = LeaveDays.empty()
+        self._version: Any = None
+
+    def refresh(self, df: pd.DataFrame, version: Any) -> None:
+        """Rebuild the loaded entries and leave days when the dataset version changed"""
+        with self._lock:
+            if version == self._version:
+                return
+            leave = self._leave_rows(df)
+            self._loaded = set(zip(leave["Date"].dt.date, leave["Subcategory"]))
+            self._days = LeaveDays(leave["Date"].to_numpy(), leave["Subcategory"].to_numpy())
+            self._pending -= self._loaded
+            self._version = version
+
+    def days(self, df: pd.DataFrame, version: Any) -> LeaveDays:
+        """The leave day bitmap of this frame, built once per dataset version"""
+        self.refresh(df, version)
+        with self._lock:
+            return self._days
+
+    def contains(self, leave_date: datetime, person: str) -> bool:
+        key = self._key(leave_date, person)
+        with self._lock:
+            return key in self._loaded or key in self._pending
+
+    def add(self, leave_date: datetime, person: str) -> None:
+        """Remember leave that was just recorded but may not be loaded yet"""
+        with self._lock:
+            self._pending.add(self._key(leave_date, person))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._loaded = set()
+            self._days = LeaveDays.empty()
+            self._version = None
+
+    @staticmethod
+    def _key(leave_date: datetime, person: str) -> LeaveKey:
+        return pd.Timestamp(leave_date).date(), str(person)
+
+    @staticmethod
+    def _leave_rows(df: pd.DataFrame) -> pd.DataFrame:
+        """Date and person of every leave row, without touching the frame"""
+        if df.empty or "Category" not in df.columns:
+            return pd.DataFrame({"Date": pd.Series([], dtype="datetime64[ns]"), "Subcategory": pd.Series([], dtype=str)})
+        leave = df.loc[df["Category"] == "Leave", ["Date", "Subcategory"]]
+        return leave.assign(Subcategory=leave["Subcategory"].astype(str))
+
+
+@st.cache_resource
+def get_leave_index() -> LeaveIndex:
+    """Get the process-wide leave index"""
+    return LeaveIndex()
@@ -0,0 +1,170 @@
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+
+import gspread
+import requests
+import streamlit as st
+from config.config import Config
+
+# Call priorities, lower runs first
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+PRIORITY_BACKGROUND = 2
+
+# Sheets API responses worth retrying after a pause
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _TokenBucket:
+    """Token bucket refilled continuously at a per-minute quota"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, tokens: float) -> float:
+        """Time until the bucket holds the given number of tokens"""
+        return max(tokens - self.tokens, 0.0) / self.rate
+
+
+class SheetsRateLimiter:
+    """Central scheduler that every Google Sheets call passes through
+
+    Reads and writes draw from separate token buckets sized to the Sheets
+    per-minute quotas. Waiting callers are served in priority order, and
+    background reads leave a reserve of read tokens for interactive reads. Calls
+    that hit 429 or a 5xx error are retried with jittered exponential backoff.
+    A 429 also empties the bucket so every caller slows down together.
+
+    Writes are only retried on 429: after a 5xx or a timeout the sheet may
+    already have applied them, and sending an append again would duplicate
+    rows. Callers that retry writes later check the sheet first.
+    """
+
+    def __init__(self, read_per_minute: int, write_per_minute: int,
+                 background_reserve: float = 0.2, base_backoff: float = 1.0,
+                 max_backoff: float = 32.0):
+        self._buckets = {
+            "read": _TokenBucket(read_per_minute),
+            "write": _TokenBucket(write_per_minute),
+        }
+        self.background_reserve = background_reserve
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._waiting: Dict[str, Dict[int, int]] = {"read": {}, "write": {}}
+        self._recent: Dict[str, Deque[float]] = {"read": deque(), "write": deque()}
+        self._counters = {
+            "calls": 0, "retries": 0, "failures": 0,
+            "throttled": 0, "throttled_seconds": 0.0,
+            "http_429": 0, "http_5xx": 0,
+        }
+
+    def call(self, operation: Callable[[], Any], kind: str = "read",
+             priority: int = PRIORITY_READ, max_retries: int = 5) -> Any:
+        """Run a Sheets operation under the quota, retrying transient failures"""
+        for attempt in range(max_retries):
+            self.acquire(kind, priority)
+            try:
+                return operation()
+            except Exception as error:
+                status = self._status_of(error)
+                transient = status in RETRYABLE_STATUSES or isinstance(
+                    error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                )
+                if kind == "write":
+                    # Only a 429 is known to have been rejected before it was applied
+                    transient = status == 429
+                with self._condition:
+                    if status == 429:
+                        self._counters["http_429"] += 1
+                        self._buckets[kind].tokens = 0.0
+                    elif status is not None and status >= 500:
+                        self._counters["http_5xx"] += 1
+                    if not transient or attempt == max_retries - 1:
+                        self._counters["failures"] += 1
+                        raise
+                    self._counters["retries"] += 1
+
+                # Full jitter keeps concurrent sessions from retrying in lockstep
+                time.sleep(random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt)))
+
+    def acquire(self, kind: str = "read", priority: int = PRIORITY_READ) -> None:
+        """Block until a token of the given kind is available for this priority"""
+        bucket = self._buckets[kind]
+        ticket = next(self._sequence)
+        started = time.monotonic()
+        # Background calls may only dip into the bucket above the reserve
+        needed = 1.0 + (bucket.capacity * self.background_reserve if priority >= PRIORITY_BACKGROUND else 0.0)
+
+        with self._condition:
+            waiting = self._waiting[kind]
+            waiting[ticket] = priority
+            try:
+                while True:
+                    bucket.refill()
+                    first = min(waiting, key=lambda t: (waiting[t], t))
+                    if first == ticket and bucket.tokens >= needed:
+                        break
+                    self._condition.wait(max(bucket.seconds_until(needed), 0.05))
+            finally:
+                del waiting[ticket]
+                self._condition.notify_all()
+
+            bucket.tokens -= 1.0
+            waited = time.monotonic() - started
+            if waited > 0.01:
+                self._counters["throttled"] += 1
+                self._counters["throttled_seconds"] += waited
+            self._counters["calls"] += 1
+            self._record_usage(kind)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current per-minute usage for the debug panel"""
+        with self._condition:
+            for kind in self._buckets:
+                self._record_usage(kind, count=False)
+            stats = dict(self._counters)
+            stats["throttled_seconds"] = round(stats["throttled_seconds"], 2)
+            for kind, bucket in self._buckets.items():
+                bucket.refill()
+                stats[f"{kind}_last_minute"] = len(self._recent[kind])
+                stats[f"{kind}_quota_per_minute"] = int(bucket.capacity)
+                stats[f"{kind}_tokens_left"] = int(bucket.tokens)
+            return stats
+
+    def _record_usage(self, kind: str, count: bool = True) -> None:
+        """Keep a sliding one-minute window of calls per kind"""
+        now = time.monotonic()
+        recent = self._recent[kind]
+        if count:
+            recent.append(now)
+        while recent and now - recent[0] > 60:
+            recent.popleft()
+
+    @staticmethod
+    def _status_of(error: Exception):
+        if isinstance(error, gspread.exceptions.APIError):
+            return getattr(getattr(error, "response", None), "status_code", None)
+        return None
+
+
+@st.cache_resource
+def get_rate_limiter() -> SheetsRateLimiter:
+    """Get the process-wide Sheets rate limiter"""
+    return SheetsRateLimiter(
+        read_per_minute=Config.SHEETS_READ_QUOTA_PER_MINUTE,
+        write_per_minute=Config.SHEETS_WRITE_QUOTA_PER_MINUTE
+    )
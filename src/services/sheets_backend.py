@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from src.services.google_sheets_service import GoogleSheetsService
+from src.services.rate_limiter import PRIORITY_READ
+from src.services.storage_backend import StorageBackend
+from src.services.sync_engine import get_sync_engine
+from src.services.write_ahead_log import get_replay_worker, get_write_ahead_log
+from src.services.write_queue import get_write_queue
+
+
+class GoogleSheetsBackend(StorageBackend):
+    """Ledger stored in the Google Sheet
+
+    Reads go through the delta sync engine; appends are recorded in the local
+    write-ahead log and replayed to the sheet in the background. As a mirror,
+    updates and deletes are logged and replayed the same way.
+    """
+
+    name = "Google Sheets"
+
+    def __init__(self):
+        self.sheets_service = GoogleSheetsService()
+        self.sync_engine = get_sync_engine()
+        self.write_queue = get_write_queue(self.sheets_service)
+        self.write_log = get_write_ahead_log()
+        self.replay_worker = get_replay_worker(self.write_log, self.write_queue, self.sheets_service, self.sync_engine)
+
+    def read_all(self, priority: int = PRIORITY_READ) -> pd.DataFrame:
+        """Read the ledger, fetching only rows added since the last sync"""
+        return self.sync_engine.sync(self.sheets_service, priority)
+
+    def read_range(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """Read the rows dated within [start, end] (the sheet has no server-side filter)"""
+        return self.filter_range(self.read_all(), start, end)
+
+    def append_batch(self, rows: List[List[Any]], row_ids: Optional[List[str]] = None) -> List[str]:
+        """Record rows in the write-ahead log and wake the replay worker"""
+        row_ids = self.write_log.record_many(rows, row_ids)
+        self.replay_worker.notify()
+        return row_ids
+
+    def update_row(self, row_id: str, row: List[Any]) -> bool:
+        """Overwrite the sheet row carrying this row ID"""
+        sheet_row = self.sheets_service.find_sheet_row(row_id)
+        if sheet_row is None:
+            return False
+        self.sheets_service.update_row_values(sheet_row, row + [row_id])
+        # Edits above the sync tail window are invisible to the checksum
+        self.sync_engine.reset()
+        return True
+
+    def delete_row(self, row_id: str) -> bool:
+        """Delete the sheet row carrying this row ID"""
+        sheet_row = self.sheets_service.find_sheet_row(row_id)
+        if sheet_row is None:
+            return False
+        self.sheets_service.delete_sheet_row(sheet_row)
+        self.sync_engine.reset()
+        return True
+
+    def queue_update(self, row_id: str, row: List[Any]) -> None:
+        """Log an update and let the replay worker apply it once the row is in the sheet"""
+        self.write_log.record_change(row_id, "update", row)
+        self.replay_worker.notify()
+
+    def queue_delete(self, row_id: str) -> None:
+        """Log a delete and let the replay worker apply it once the row is in the sheet"""
+        self.write_log.record_change(row_id, "delete")
+        self.replay_worker.notify()
+
+    def ensure_row_ids(self) -> int:
+        """Write row IDs into sheet rows that predate them"""
+        assigned = self.sheets_service.fill_missing_row_ids()
+        if assigned:
+            self.sync_engine.reset()
+        return assigned
+
+    def test_connection(self) -> tuple[bool, str]:
+        return self.sheets_service.test_connection()
+
+    def is_available(self) -> bool:
+        return self.sheets_service.get_worksheet() is not None
+
+    def pending_write_count(self) -> int:
+        return self.write_log.pending_count()
+
+    def last_good_snapshot(self) -> Optional[pd.DataFrame]:
+        return self.sync_engine.snapshot()
+
+    def connection_status(self) -> Dict[str, Any]:
+        return self.sheets_service.breaker.snapshot()
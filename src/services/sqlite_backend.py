@@ -0,0 +1,209 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+from config.config import Config
+from src.services.storage_backend import StorageBackend
+from src.services.rate_limiter import PRIORITY_READ
+from src.models.ledger_schema import apply_schema, new_row_id, to_export_frame
+
+# Sheet header for each stored column, in sheet order
+COLUMN_HEADERS = {
+    "date": "Date",
+    "category": "Category",
+    "subcategory": "Subcategory",
+    "description": "Description",
+    "amount": "Amount (₹)",
+    "paid_by": "Paid by",
+    "timestamp": "Timestamp",
+    "row_id": "Row ID",
+}
+ROW_COLUMNS = list(COLUMN_HEADERS)[:-1]
+
+
+class SQLiteBackend(StorageBackend):
+    """Ledger stored in a local SQLite database
+
+    Works fully offline. When a Google Sheets mirror is given, the local store
+    is seeded from the sheet on first use and every change is forwarded to it;
+    the local database stays the source of truth. Seeding first has the mirror
+    give its older rows row IDs, so local rows and mirror rows share IDs and
+    updates and deletes can be forwarded. A failed seed is reported in
+    ``seed_error`` and retried after ``Config.MIRROR_SEED_RETRY_SECONDS``;
+    both are kept per process, since a backend is built on every rerun.
+    """
+
+    name = "SQLite"
+
+    _schema_lock = threading.Lock()
+    _seed_lock = threading.Lock()
+    seed_error: Optional[str] = None
+    _seed_retry_at = 0.0
+
+    def __init__(self, db_path: str, mirror: Optional[StorageBackend] = None):
+        self.db_path = db_path
+        self.mirror = mirror
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._schema_lock, self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS transactions (
+                    row_id TEXT PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    subcategory TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT '',
+                    amount REAL NOT NULL DEFAULT 0,
+                    paid_by TEXT NOT NULL DEFAULT '',
+                    timestamp TEXT
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def read_all(self, priority: int = PRIORITY_READ) -> pd.DataFrame:
+        """Read the whole ledger, seeding it from the mirror when empty"""
+        if self.mirror is not None and time.monotonic() >= self._seed_retry_at and self._row_count() == 0:
+            self._seed(priority)
+        return self._query("", ())
+
+    def read_range(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """Read the rows dated within [start, end] using the date index"""
+        return self._query(
+            "WHERE date BETWEEN ? AND ?",
+            (start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+        )
+
+    def append_batch(self, rows: List[List[Any]], row_ids: Optional[List[str]] = None) -> List[str]:
+        """Insert rows locally and forward them to the mirror"""
+        row_ids = row_ids or [new_row_id() for _ in rows]
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO transactions ({', '.join(ROW_COLUMNS)}, row_id) "
+                f"VALUES ({', '.join('?' * (len(ROW_COLUMNS) + 1))})",
+                [self._pad(row) + [row_id] for row, row_id in zip(rows, row_ids)]
+            )
+        if self.mirror is not None:
+            self.mirror.append_batch(rows, row_ids)
+        return row_ids
+
+    def update_row(self, row_id: str, row: List[Any]) -> bool:
+        """Replace a row locally and queue the change for the mirror"""
+        assignments = ", ".join(f"{column} = ?" for column in ROW_COLUMNS)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE transactions SET {assignments} WHERE row_id = ?",
+                self._pad(row) + [row_id]
+            )
+        if cursor.rowcount and self.mirror is not None:
+            self.mirror.queue_update(row_id, row)
+        return cursor.rowcount > 0
+
+    def delete_row(self, row_id: str) -> bool:
+        """Delete a row locally and queue the change for the mirror"""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM transactions WHERE row_id = ?", (row_id,))
+        if cursor.rowcount and self.mirror is not None:
+            self.mirror.queue_delete(row_id)
+        return cursor.rowcount > 0
+
+    def pending_write_count(self) -> int:
+        return self.mirror.pending_write_count() if self.mirror is not None else 0
+
+    def connection_status(self) -> Dict[str, Any]:
+        if self.mirror is None:
+            return {"state": "closed"}
+        return dict(self.mirror.connection_status(), mirror=True, seed_error=self.seed_error)
+
+    def test_connection(self) -> tuple[bool, str]:
+        rows = self._row_count()
+        message = f"SQLite backend ready at {self.db_path}, Rows: {rows}"
+        if self.mirror is None:
+            return True, message
+        mirror_ok, mirror_message = self.mirror.test_connection()
+        message = f"{message}; mirror: {mirror_message if mirror_ok else 'unreachable - ' + mirror_message}"
+        if self.seed_error:
+            message = f"{message}; seeding from the mirror failed - {self.seed_error}"
+        return True, message
+
+    def _row_count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def _query(self, where: str, params: tuple) -> pd.DataFrame:
+        """Run a SELECT over the ledger and shape it like the sheet frame"""
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(COLUMN_HEADERS)} FROM transactions {where} ORDER BY rowid",
+                conn, params=params
+            )
+        df = df.rename(columns=COLUMN_HEADERS)
+        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors='coerce')
+        return apply_schema(df.dropna(subset=["Date"]).reset_index(drop=True))
+
+    def _seed(self, priority: int) -> None:
+        """Seed the empty local store; on failure keep serving it and wait before trying again"""
+        with self._seed_lock:
+            # Another session may have seeded the store, or failed to, while this one waited
+            if time.monotonic() < SQLiteBackend._seed_retry_at or self._row_count():
+                return
+            try:
+                self._seed_from_mirror(priority)
+                SQLiteBackend.seed_error = None
+            except Exception as e:
+                # An unreachable mirror must not block the local store, nor be re-downloaded on every read
+                SQLiteBackend.seed_error = str(e)
+                SQLiteBackend._seed_retry_at = time.monotonic() + Config.MIRROR_SEED_RETRY_SECONDS
+                if Config.get_debug_mode():
+                    st.write(f"🔍 Debug: Seeding from the mirror failed: {str(e)}")
+
+    def _seed_from_mirror(self, priority: int) -> None:
+        """Copy the mirror's ledger into the empty local store (without echoing it back)"""
+        # Rows without an ID could not be updated or deleted in the mirror later
+        self.mirror.ensure_row_ids()
+        df = to_export_frame(self.mirror.read_all(priority))
+        if df.empty:
+            return
+
+        def column(header: str, default: Any = "") -> pd.Series:
+            return df[header] if header in df.columns else pd.Series(default, index=df.index)
+
+        records = pd.DataFrame({
+            "date": df["Date"].dt.strftime("%Y-%m-%d"),
+            "category": column("Category"),
+            "subcategory": column("Subcategory"),
+            "description": column("Description"),
+            "amount": pd.to_numeric(column("Amount (₹)", 0), errors='coerce').fillna(0),
+            "paid_by": column("Paid by"),
+            "timestamp": pd.to_datetime(column("Timestamp", None), errors='coerce').dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "row_id": column("Row ID", None),
+        })
+        missing = records["row_id"].isna() | (records["row_id"].astype(str).str.strip() == "")
+        if missing.any():
+            raise ValueError(f"{int(missing.sum())} mirror rows have no row ID")
+        # The same row appended twice carries the same ID; keep the first copy
+        duplicated = records["row_id"].duplicated()
+        if duplicated.any():
+            if Config.get_debug_mode():
+                st.write(f"🔍 Debug: Skipping {int(duplicated.sum())} duplicate mirror rows")
+            records = records[~duplicated]
+
+        with self._connect() as conn:
+            records.to_sql("transactions", conn, if_exists="append", index=False)
+
+        if Config.get_debug_mode():
+            st.write(f"🔍 Debug: Seeded local store with {len(records)} rows from the sheet")
+
+    @staticmethod
+    def _pad(row: List[Any]) -> List[Any]:
+        """Fill missing trailing fields (e.g. an absent timestamp) with None"""
+        return (list(row) + [None] * len(ROW_COLUMNS))[:len(ROW_COLUMNS)]
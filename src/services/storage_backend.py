@@ -0,0 +1,92 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from config.config import Config
+from src.services.rate_limiter import PRIORITY_READ
+
+
+class StorageBackend(ABC):
+    """Interface for the store that holds the transaction ledger
+
+    Rows are passed around in sheet order: the six transaction fields from
+    ``Transaction.to_row()`` followed by the IST timestamp. Each stored row is
+    identified by a row ID returned from ``append_batch``.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def read_all(self, priority: int = PRIORITY_READ) -> pd.DataFrame:
+        """Read the whole ledger as a frame with a datetime Date column
+
+        ``priority`` is the rate limiter priority of any remote reads.
+        """
+
+    @abstractmethod
+    def read_range(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """Read the rows dated within [start, end]"""
+
+    @abstractmethod
+    def append_batch(self, rows: List[List[Any]], row_ids: Optional[List[str]] = None) -> List[str]:
+        """Append rows and return their row IDs"""
+
+    @abstractmethod
+    def update_row(self, row_id: str, row: List[Any]) -> bool:
+        """Replace the row with the given ID; returns False if it does not exist"""
+
+    @abstractmethod
+    def delete_row(self, row_id: str) -> bool:
+        """Delete the row with the given ID; returns False if it does not exist"""
+
+    def queue_update(self, row_id: str, row: List[Any]) -> None:
+        """Apply an update forwarded by another store; mirrors may defer it"""
+        self.update_row(row_id, row)
+
+    def queue_delete(self, row_id: str) -> None:
+        """Apply a delete forwarded by another store; mirrors may defer it"""
+        self.delete_row(row_id)
+
+    def ensure_row_ids(self) -> int:
+        """Give every stored row a row ID; returns how many were assigned"""
+        return 0
+
+    def test_connection(self) -> tuple[bool, str]:
+        """Check that the backend is reachable"""
+        return True, f"{self.name} backend ready"
+
+    def is_available(self) -> bool:
+        """Whether the backend can currently serve reads"""
+        return True
+
+    def last_good_snapshot(self) -> Optional[pd.DataFrame]:
+        """The most recent successfully loaded ledger, served read-only during outages"""
+        return None
+
+    def connection_status(self) -> Dict[str, Any]:
+        """Circuit breaker state of the remote store (closed when healthy)"""
+        return {"state": "closed"}
+
+    def pending_write_count(self) -> int:
+        """Number of accepted writes not yet propagated to their final store"""
+        return 0
+
+    @staticmethod
+    def filter_range(df: pd.DataFrame, start: datetime, end: datetime) -> pd.DataFrame:
+        """Restrict a ledger frame to rows dated within [start, end]"""
+        if df.empty:
+            return df
+        return df[(df["Date"] >= start) & (df["Date"] <= end)].reset_index(drop=True)
+
+
+def create_storage_backend() -> StorageBackend:
+    """Build the storage backend selected by Config.STORAGE_BACKEND"""
+    from src.services.sheets_backend import GoogleSheetsBackend
+    from src.services.sqlite_backend import SQLiteBackend
+
+    if Config.STORAGE_BACKEND == "sqlite":
+        mirror = GoogleSheetsBackend() if Config.SHEETS_MIRROR_ENABLED else None
+        return SQLiteBackend(Config.LOCAL_DB_PATH, mirror)
+
+    return GoogleSheetsBackend()
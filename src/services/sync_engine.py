@@ -0,0 +1,236 @@
+import hashlib
+import threading
+import time
+import uuid
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from gspread.utils import rowcol_to_a1
+from config.config import Config
+from src.models import ledger_schema
+from src.services.dataset_cache import LOAD_ID_ATTR, LOAD_PARENT_ATTR
+from src.services.rate_limiter import PRIORITY_READ
+
+# Google Sheets date serials count days from this epoch
+SHEETS_EPOCH = "1899-12-30"
+
+
+class SheetSyncEngine:
+    """Keeps a local copy of the ledger in step with the sheet using ranged reads
+
+    The engine remembers a watermark (number of data rows, the IST timestamp of
+    the last row and a checksum of the last few rows). A sync reads a single
+    range starting at that tail window: if the tail still matches, only the
+    rows after it are parsed and appended to the cached frame; a mismatch means
+    the sheet was edited out-of-band and triggers a full reload. Edits above
+    the tail window cannot be seen by the checksum, so the whole sheet is
+    also reloaded once every ``full_reload_seconds``.
+
+    Values are fetched column-major and unformatted, so every column is
+    converted straight into its ledger schema type (datetime64 dates,
+    integer paise, categorical labels) without building a dict per row.
+
+    Every frame carries a load ID, and a delta frame also names the frame it
+    appends to, so the dataset cache can tell appends from reloads.
+    """
+
+    def __init__(self, tail_window: int, full_reload_seconds: float):
+        self.tail_window = tail_window
+        self.full_reload_seconds = full_reload_seconds
+        self.reloaded_at = 0.0
+        self._lock = threading.Lock()
+        self.header: List[str] = []
+        self.row_count = 0
+        self.tail: List[Tuple[Any, ...]] = []
+        self.frame = pd.DataFrame()
+        self.tail_checksum: Optional[str] = None
+        self.last_timestamp: Optional[str] = None
+
+    def sync(self, sheets_service, priority: int = PRIORITY_READ) -> pd.DataFrame:
+        """Bring the local frame up to date with the sheet and return it"""
+        with self._lock:
+            if (not self.header or not self.row_count
+                    or time.monotonic() - self.reloaded_at >= self.full_reload_seconds):
+                self._full_reload(sheets_service, priority)
+                return self.frame
+
+            # Data rows live on sheet rows 2..row_count+1; re-read the tail window plus everything after it.
+            # Always read through the row ID column, even when the header stops before it
+            window = min(self.tail_window, self.row_count)
+            first_row = self.row_count + 2 - window
+            width = max(len(self.header), Config.ROW_ID_COLUMN_INDEX + 1)
+            last_col = rowcol_to_a1(1, width).rstrip("0123456789")
+            raw_columns = sheets_service.get_columns(f"A{first_row}:{last_col}", priority=priority)
+
+            if self._has_values(raw_columns[len(self.header):]):
+                # Rows now fill columns the header has no name for (e.g. the timestamp and
+                # row ID of our own writes); reload so the header picks them up
+                if Config.get_debug_mode():
+                    st.write("🔍 Debug: Sheet rows are wider than the header, doing full reload")
+                self._full_reload(sheets_service, priority)
+                return self.frame
+
+            columns, fetched = self._pad_columns(raw_columns, len(self.header))
+
+            tail = self._rows_of(columns, 0, min(window, fetched))
+            if (len(tail) < window or self._checksum(tail) != self.tail_checksum
+                    or self._timestamp_of(tail[-1]) != self.last_timestamp):
+                if Config.get_debug_mode():
+                    st.write("🔍 Debug: Sheet tail changed out-of-band, doing full reload")
+                self._full_reload(sheets_service, priority)
+                return self.frame
+
+            new_count = fetched - window
+            if new_count > 0:
+                new_columns = [column[window:fetched] for column in columns]
+                self.frame = self._mark(
+                    ledger_schema.concat(self.frame, self._to_frame(new_columns)), self.frame.attrs.get(LOAD_ID_ATTR)
+                )
+                self.row_count += new_count
+                self._update_watermark(tail + self._rows_of(new_columns, 0, new_count))
+
+            if Config.get_debug_mode():
+                st.write(f"🔍 Debug: Delta sync fetched {max(new_count, 0)} new rows")
+
+            return self.frame
+
+    def snapshot(self) -> Optional[pd.DataFrame]:
+        """The last successfully synced frame, or None before the first sync"""
+        with self._lock:
+            return self.frame if self.header else None
+
+    def reset(self) -> None:
+        """Forget the watermark so the next sync does a full reload"""
+        with self._lock:
+            self.header = []
+            self.row_count = 0
+            self.tail = []
+            self.frame = pd.DataFrame()
+            self.tail_checksum = None
+            self.last_timestamp = None
+            self.reloaded_at = 0.0
+
+    def _full_reload(self, sheets_service, priority: int) -> None:
+        """Download the entire sheet and rebuild the watermark"""
+        raw_columns = sheets_service.get_columns(priority=priority)
+        self.reloaded_at = time.monotonic()
+
+        if not raw_columns:
+            self.header, self.row_count, self.tail = [], 0, []
+            self.frame = self._mark(pd.DataFrame())
+            self.tail_checksum = self.last_timestamp = None
+            return
+
+        self.header = self._name_columns([column[0] if column else "" for column in raw_columns])
+        columns, self.row_count = self._pad_columns([column[1:] for column in raw_columns], len(self.header))
+        self.frame = self._mark(self._to_frame(columns))
+        self._update_watermark(self._rows_of(columns, max(self.row_count - self.tail_window, 0), self.row_count))
+
+        if Config.get_debug_mode():
+            st.write(f"🔍 Debug: Full sync loaded {self.row_count} records from sheet")
+
+    def _update_watermark(self, recent_rows: List[Tuple[Any, ...]]) -> None:
+        """Record the last timestamp and tail checksum of the local copy"""
+        self.tail = recent_rows[-self.tail_window:]
+        self.tail_checksum = self._checksum(self.tail)
+        self.last_timestamp = self._timestamp_of(self.tail[-1]) if self.tail else None
+
+    @staticmethod
+    def _mark(frame: pd.DataFrame, parent: Optional[str] = None) -> pd.DataFrame:
+        """Give a freshly built frame its load ID and, for a delta, the ID of the frame it extends"""
+        frame.attrs = {LOAD_ID_ATTR: uuid.uuid4().hex}
+        if parent is not None:
+            frame.attrs[LOAD_PARENT_ATTR] = parent
+        return frame
+
+    @staticmethod
+    def _name_columns(header: List[Any]) -> List[str]:
+        """Give the timestamp, row ID and any other unlabelled columns a unique name"""
+        fallback = {Config.TIMESTAMP_COLUMN_INDEX: "Timestamp", Config.ROW_ID_COLUMN_INDEX: "Row ID"}
+        names = []
+        for index, name in enumerate(header):
+            name = str(name).strip() or fallback.get(index, f"Column {index + 1}")
+            names.append(name if name not in names else f"{name} ({index + 1})")
+        return names
+
+    @staticmethod
+    def _pad_columns(columns: Sequence[Sequence[Any]], width: int) -> Tuple[List[List[Any]], int]:
+        """Pad column-major values (which drop trailing blanks) to a common length and width"""
+        columns = [list(column) for column in columns[:width]]
+        columns += [[] for _ in range(width - len(columns))]
+        length = max((len(column) for column in columns), default=0)
+        for column in columns:
+            column.extend([""] * (length - len(column)))
+        return columns, length
+
+    @staticmethod
+    def _has_values(columns: Sequence[Sequence[Any]]) -> bool:
+        """Whether any of the given columns holds a non-blank value"""
+        return any(str(value).strip() for column in columns for value in column)
+
+    @staticmethod
+    def _rows_of(columns: List[List[Any]], start: int, stop: int) -> List[Tuple[Any, ...]]:
+        """Transpose a slice of column-major values into row tuples"""
+        return list(zip(*[column[start:stop] for column in columns]))
+
+    @staticmethod
+    def _checksum(rows: List[Tuple[Any, ...]]) -> str:
+        """Hash a block of rows so out-of-band edits can be detected"""
+        digest = hashlib.sha1()
+        for row in rows:
+            digest.update("\x1f".join(str(value) for value in row).encode("utf-8"))
+            digest.update(b"\x1e")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _timestamp_of(row: Tuple[Any, ...]) -> Optional[str]:
+        """Get the IST timestamp that add_record appends after the transaction fields"""
+        if len(row) > Config.TIMESTAMP_COLUMN_INDEX:
+            return str(row[Config.TIMESTAMP_COLUMN_INDEX])
+        return None
+
+    def _to_frame(self, columns: List[List[Any]]) -> pd.DataFrame:
+        """Convert column-major sheet values into a typed frame in one pass per column"""
+        data = {}
+        for name, values in zip(self.header, columns):
+            if name == "Date":
+                data[name] = self._parse_dates(values).dt.floor("D")
+            elif name == "Timestamp":
+                data[name] = self._parse_dates(values)
+            elif name == ledger_schema.AMOUNT_COLUMN:
+                data[ledger_schema.AMOUNT_PAISE_COLUMN] = ledger_schema.to_paise(values)
+            elif name in ledger_schema.CATEGORICAL_LABELS:
+                data[name] = ledger_schema.categorical(name, values)
+            elif name in ledger_schema.INTERNED_COLUMNS:
+                data[name] = ledger_schema.intern_text(values)
+            else:
+                data[name] = np.asarray(values, dtype=object)
+
+        df = pd.DataFrame(data)
+
+        if not df.empty and "Date" in df.columns:
+            # Remove any rows with invalid dates
+            df = df.dropna(subset=['Date']).reset_index(drop=True)
+
+        return df
+
+    @staticmethod
+    def _parse_dates(values: List[Any]) -> pd.Series:
+        """Turn date serials (and any dates stored as text) into datetime64 values"""
+        raw = pd.Series(values, dtype=object)
+        serials = pd.to_numeric(raw, errors='coerce')
+        dates = pd.to_datetime(serials, unit="D", origin=SHEETS_EPOCH).dt.round("s")
+
+        text = raw[serials.isna() & raw.astype(str).str.strip().ne("")]
+        if not text.empty:
+            dates[text.index] = pd.to_datetime(text.astype(str), errors='coerce')
+
+        return dates.astype("datetime64[ns]")
+
+
+@st.cache_resource
+def get_sync_engine() -> SheetSyncEngine:
+    """Get the process-wide sheet sync engine"""
+    return SheetSyncEngine(Config.SYNC_TAIL_WINDOW_ROWS, Config.SYNC_FULL_RELOAD_MINUTES * 60)
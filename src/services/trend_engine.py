@@ -0,0 +1,41 @@
+from datetime import date
+from typing import Optional, Tuple
+
+import pandas as pd
+from config.config import Config
+from src.services.aggregate_cube import AggregateCube
+from src.models.ledger_schema import AMOUNT_COLUMN
+
+
+def window_months(window: str, today: Optional[date] = None) -> Tuple[int, int]:
+    """First and last month (as ``year * 12 + month - 1``) of a trend window ending this month
+
+    Windows are the keys of Config.TREND_WINDOWS: a number of months
+    (including the current one), "YTD" for the calendar year so far, or
+    "FY" for the fiscal year so far (starting in Config.FISCAL_YEAR_START_MONTH).
+    """
+    today = today or date.today()
+    current = today.year * 12 + today.month - 1
+    if window == "YTD":
+        return today.year * 12, current
+    if window == "FY":
+        fiscal_year = today.year if today.month >= Config.FISCAL_YEAR_START_MONTH else today.year - 1
+        return fiscal_year * 12 + Config.FISCAL_YEAR_START_MONTH - 1, current
+    months = int(window.rstrip("M"))
+    return current - months + 1, current
+
+
+def trend_matrix(cube: AggregateCube, window: str, today: Optional[date] = None) -> pd.DataFrame:
+    """Zero-filled monthly totals of every category over a window, labelled "%b %Y" """
+    matrix = cube.monthly_matrix(*window_months(window, today))
+    labelled = matrix.copy()
+    labelled.index = matrix.index.strftime("%b %Y")
+    labelled.index.name = "YearMonth"
+    return labelled
+
+
+def category_trend(cube: AggregateCube, category: str, window: str, today: Optional[date] = None) -> pd.DataFrame:
+    """Monthly totals of one category over a window as YearMonth / Amount (₹) columns"""
+    matrix = trend_matrix(cube, window, today)
+    amounts = matrix[category] if category in matrix.columns else pd.Series(0.0, index=matrix.index)
+    return amounts.rename(AMOUNT_COLUMN).reset_index()
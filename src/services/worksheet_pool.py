@@ -0,0 +1,139 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import gspread
+import streamlit as st
+from config.config import Config
+from src.services.rate_limiter import SheetsRateLimiter
+from src.utils.single_flight import SingleFlight
+
+
+@dataclass
+class _WorksheetHandle:
+    """A resolved worksheet together with the client it is bound to"""
+    client: gspread.Client
+    worksheet: gspread.Worksheet
+    checked_at: float
+
+
+class WorksheetPool:
+    """Process-wide pool of resolved spreadsheet and worksheet handles
+
+    Spreadsheets are looked up by name through Drive only once; afterwards the
+    spreadsheet key is reused, so reopening skips the Drive search (opening by
+    key and picking the worksheet still fetch the metadata once each).
+    Worksheet handles are reused until their TTL expires, at which point a
+    lightweight health check confirms the worksheet still exists.
+
+    Every call goes through the rate limiter and runs outside the pool lock;
+    concurrent callers that miss on the same worksheet share one lookup.
+    """
+
+    # HTTP statuses that mean the cached handle (or its auth) is no longer valid
+    STALE_HANDLE_STATUSES = (401, 403, 404)
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._spreadsheet_keys: Dict[str, str] = {}
+        self._handles: Dict[Tuple[str, str], _WorksheetHandle] = {}
+        # Bumped by invalidate() so lookups started earlier do not store their result
+        self._generation = 0
+        self.flight = SingleFlight()
+
+    def get(self, client: gspread.Client, spreadsheet_name: str, worksheet_name: str,
+            limiter: SheetsRateLimiter) -> gspread.Worksheet:
+        """Return a worksheet handle, resolving or health-checking it if needed"""
+        pool_key = (spreadsheet_name, worksheet_name)
+
+        with self._lock:
+            handle = self._handles.get(pool_key)
+            if handle is not None and handle.client is not client:
+                handle = None
+            if handle is not None and time.monotonic() - handle.checked_at < self.ttl_seconds:
+                return handle.worksheet
+            generation = self._generation
+            key = self._spreadsheet_keys.get(spreadsheet_name)
+
+        return self.flight.do(
+            pool_key + (id(client), generation),
+            lambda: self._refresh(client, pool_key, handle, key, generation, limiter)
+        )
+
+    def invalidate(self, spreadsheet_name: Optional[str] = None,
+                   forget_key: bool = False) -> None:
+        """Drop cached handles (all, or those of one spreadsheet)"""
+        with self._lock:
+            self._generation += 1
+            for pool_key in list(self._handles):
+                if spreadsheet_name is None or pool_key[0] == spreadsheet_name:
+                    del self._handles[pool_key]
+
+            if forget_key:
+                if spreadsheet_name is None:
+                    self._spreadsheet_keys.clear()
+                else:
+                    self._spreadsheet_keys.pop(spreadsheet_name, None)
+
+    @classmethod
+    def is_stale_handle_error(cls, error: Exception) -> bool:
+        """Check whether an error means the handle should be refreshed"""
+        if not isinstance(error, gspread.exceptions.APIError):
+            return False
+        response = getattr(error, "response", None)
+        return getattr(response, "status_code", None) in cls.STALE_HANDLE_STATUSES
+
+    def _refresh(self, client: gspread.Client, pool_key: Tuple[str, str], handle: Optional[_WorksheetHandle],
+                 key: Optional[str], generation: int, limiter: SheetsRateLimiter) -> gspread.Worksheet:
+        """Health-check an expired handle or resolve a new one, then pool it (lock not held)"""
+        spreadsheet_name, worksheet_name = pool_key
+        if handle is not None and self._is_healthy(handle, limiter):
+            worksheet = handle.worksheet
+        else:
+            worksheet = self._resolve(client, spreadsheet_name, worksheet_name, key, limiter)
+            if Config.get_debug_mode():
+                st.write(f"🔍 Debug: Resolved worksheet handle for {spreadsheet_name}/{worksheet_name}")
+
+        with self._lock:
+            if generation == self._generation:
+                self._spreadsheet_keys[spreadsheet_name] = worksheet.spreadsheet.id
+                self._handles[pool_key] = _WorksheetHandle(client, worksheet, time.monotonic())
+        return worksheet
+
+    @staticmethod
+    def _resolve(client: gspread.Client, spreadsheet_name: str, worksheet_name: str,
+                 key: Optional[str], limiter: SheetsRateLimiter) -> gspread.Worksheet:
+        """Open the worksheet, using the cached spreadsheet key when available"""
+        if key is None:
+            # Drive search by name, then the spreadsheet metadata
+            sheet = limiter.call(lambda: client.open(spreadsheet_name))
+        else:
+            # Skips the Drive search, but still fetches the spreadsheet metadata
+            sheet = limiter.call(lambda: client.open_by_key(key))
+
+        # Fetches the metadata again to find the worksheet
+        return limiter.call(lambda: sheet.worksheet(worksheet_name))
+
+    @staticmethod
+    def _is_healthy(handle: _WorksheetHandle, limiter: SheetsRateLimiter) -> bool:
+        """Confirm the worksheet still exists with a properties-only metadata call"""
+        try:
+            metadata = limiter.call(lambda: handle.worksheet.spreadsheet.fetch_sheet_metadata(
+                params={"fields": "sheets.properties"}
+            ))
+        except Exception:
+            return False
+
+        for sheet in metadata.get("sheets", []):
+            properties = sheet.get("properties", {})
+            if properties.get("sheetId") == handle.worksheet.id:
+                return properties.get("title") == handle.worksheet.title
+        return False
+
+
+@st.cache_resource
+def get_worksheet_pool() -> WorksheetPool:
+    """Get the process-wide worksheet handle pool"""
+    return WorksheetPool(Config.WORKSHEET_HANDLE_TTL_MINUTES * 60)
@@ -0,0 +1,261 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import streamlit as st
+from config.config import Config
+from src.models.ledger_schema import new_row_id
+from src.services.rate_limiter import PRIORITY_BACKGROUND
+from src.services.write_queue import AppendWriteQueue, PendingWrite
+
+
+class WriteAheadLog:
+    """SQLite-backed log of submitted rows that have not yet reached the sheet
+
+    Every row is stored locally with a unique row ID before anything is sent to
+    Google Sheets, so a submission survives network outages and restarts. The
+    row ID is written to the sheet as well, which makes replays idempotent.
+    Updates and deletes of rows (forwarded by a local primary store) are
+    logged in submission order as well.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS pending_writes (
+                    row_id TEXT PRIMARY KEY,
+                    row_json TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    synced_at REAL
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS pending_changes (
+                    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    row_id TEXT NOT NULL,
+                    operation TEXT NOT NULL,
+                    row_json TEXT,
+                    created_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    synced_at REAL
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def record_many(self, rows: List[List[Any]], row_ids: Optional[List[str]] = None) -> List[str]:
+        """Durably store several rows in one transaction and return their row IDs"""
+        row_ids = row_ids or [new_row_id() for _ in rows]
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO pending_writes (row_id, row_json, created_at) VALUES (?, ?, ?)",
+                [(row_id, json.dumps(row), now) for row_id, row in zip(row_ids, rows)]
+            )
+        return row_ids
+
+    def pending(self, exclude: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get unsynced entries in submission order"""
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT row_id, row_json, attempts FROM pending_writes "
+                "WHERE synced_at IS NULL ORDER BY created_at, rowid"
+            )
+            entries = [
+                {"row_id": row_id, "row": json.loads(row_json), "attempts": attempts}
+                for row_id, row_json, attempts in cursor
+            ]
+        if exclude:
+            entries = [entry for entry in entries if entry["row_id"] not in exclude]
+        return entries
+
+    def pending_count(self) -> int:
+        """Number of rows and row changes still waiting to reach the sheet"""
+        with self._lock, self._connect() as conn:
+            return sum(
+                conn.execute(f"SELECT COUNT(*) FROM {table} WHERE synced_at IS NULL").fetchone()[0]
+                for table in ("pending_writes", "pending_changes")
+            )
+
+    def record_change(self, row_id: str, operation: str, row: Optional[List[Any]] = None) -> None:
+        """Durably store an update (with the new row) or a delete of a row"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO pending_changes (row_id, operation, row_json, created_at) VALUES (?, ?, ?, ?)",
+                (row_id, operation, json.dumps(row) if row is not None else None, time.time())
+            )
+
+    def pending_changes(self) -> List[Dict[str, Any]]:
+        """Get unsynced row changes in submission order"""
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT change_id, row_id, operation, row_json FROM pending_changes "
+                "WHERE synced_at IS NULL ORDER BY change_id"
+            )
+            return [
+                {"change_id": change_id, "row_id": row_id, "operation": operation,
+                 "row": json.loads(row_json) if row_json is not None else None}
+                for change_id, row_id, operation, row_json in cursor
+            ]
+
+    def mark_change_attempted(self, change_id: int, error: str) -> None:
+        """Count a failed attempt at applying a row change"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE pending_changes SET attempts = attempts + 1, last_error = ? WHERE change_id = ?",
+                (error, change_id)
+            )
+
+    def mark_change_synced(self, change_id: int) -> None:
+        """Mark a row change as applied to the sheet"""
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE pending_changes SET synced_at = ? WHERE change_id = ?", (time.time(), change_id))
+
+    def mark_attempted(self, row_ids: List[str], error: Optional[str] = None) -> None:
+        """Count a replay attempt (and its error, if any) for the given rows"""
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "UPDATE pending_writes SET attempts = attempts + 1, last_error = ? WHERE row_id = ?",
+                [(error, row_id) for row_id in row_ids]
+            )
+
+    def mark_synced(self, row_ids: List[str]) -> None:
+        """Mark rows as present in the sheet"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "UPDATE pending_writes SET synced_at = ? WHERE row_id = ?",
+                [(now, row_id) for row_id in row_ids]
+            )
+
+
+class ReplayWorker:
+    """Background worker that replays pending log entries to the sheet
+
+    Entries are pushed through the batched append queue. Entries left over from
+    an earlier run may already have been appended before the process stopped,
+    so their row IDs are first looked up in the sheet and only missing ones are
+    sent again.
+
+    Logged updates and deletes are applied one by one in submission order;
+    a change waits (with every change after it) until its row's append has
+    reached the sheet, and stops the pass when it fails.
+    """
+
+    def __init__(self, log: WriteAheadLog, queue: AppendWriteQueue, sheets_service, sync_engine,
+                 interval_seconds: float):
+        self.log = log
+        self.queue = queue
+        self.sheets_service = sheets_service
+        self.sync_engine = sync_engine
+        self.interval_seconds = interval_seconds
+        self._in_flight: Dict[str, PendingWrite] = {}
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wal-replay", daemon=True)
+        self._thread.start()
+
+    def notify(self) -> None:
+        """Wake the worker up to replay newly recorded entries"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                self._collect_finished()
+                self._replay_pending()
+                self._replay_changes()
+            except Exception:
+                # Leave entries in the log; they are retried on the next cycle
+                pass
+            self._wake.wait(self.interval_seconds)
+
+    def _collect_finished(self) -> None:
+        """Mark rows the queue has written as synced"""
+        finished = [row_id for row_id, write in self._in_flight.items() if write.done]
+        if finished:
+            self.log.mark_synced(finished)
+            for row_id in finished:
+                del self._in_flight[row_id]
+
+    def _replay_pending(self) -> None:
+        """Submit pending entries that are not already in the queue"""
+        entries = self.log.pending(exclude=set(self._in_flight))
+        if not entries:
+            return
+
+        if any(entry["attempts"] for entry in entries):
+            already_written = self.sheets_service.get_row_ids(priority=PRIORITY_BACKGROUND)
+            written = [entry["row_id"] for entry in entries if entry["row_id"] in already_written]
+            if written:
+                self.log.mark_synced(written)
+            entries = [entry for entry in entries if entry["row_id"] not in already_written]
+
+        if not entries:
+            return
+
+        row_ids = [entry["row_id"] for entry in entries]
+        self.log.mark_attempted(row_ids)
+        # The row ID goes into its own column after the timestamp
+        writes = self.queue.submit_many([entry["row"] + [entry["row_id"]] for entry in entries])
+        self._in_flight.update(zip(row_ids, writes))
+
+    def _replay_changes(self) -> None:
+        """Apply logged updates and deletes whose rows are already in the sheet"""
+        changes = self.log.pending_changes()
+        if not changes:
+            return
+
+        unsynced = {entry["row_id"] for entry in self.log.pending()}
+        applied = False
+        try:
+            for change in changes:
+                if change["row_id"] in unsynced:
+                    break
+                try:
+                    self._apply_change(change)
+                except Exception as e:
+                    self.log.mark_change_attempted(change["change_id"], str(e))
+                    break
+                self.log.mark_change_synced(change["change_id"])
+                applied = True
+        finally:
+            if applied:
+                # Edits above the sync tail window are invisible to the checksum
+                self.sync_engine.reset()
+
+    def _apply_change(self, change: Dict[str, Any]) -> None:
+        """Update or delete the sheet row carrying the change's row ID"""
+        sheet_row = self.sheets_service.find_sheet_row(change["row_id"], priority=PRIORITY_BACKGROUND)
+        if sheet_row is None:
+            # The row is no longer in the sheet (or an earlier attempt already deleted it)
+            return
+        if change["operation"] == "delete":
+            self.sheets_service.delete_sheet_row(sheet_row)
+        else:
+            self.sheets_service.update_row_values(sheet_row, change["row"] + [change["row_id"]])
+
+
+@st.cache_resource
+def get_write_ahead_log() -> WriteAheadLog:
+    """Get the process-wide write-ahead log"""
+    return WriteAheadLog(Config.LOCAL_DB_PATH)
+
+
+@st.cache_resource
+def get_replay_worker(_log: WriteAheadLog, _queue: AppendWriteQueue, _sheets_service, _sync_engine) -> ReplayWorker:
+    """Get the process-wide replay worker"""
+    return ReplayWorker(_log, _queue, _sheets_service, _sync_engine, Config.WAL_REPLAY_INTERVAL_SECONDS)
@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Any, List, Optional
+
+import streamlit as st
+from config.config import Config
+from src.services.rate_limiter import PRIORITY_BACKGROUND
+
+
+class PendingWrite:
+    """A queued row and whether it has reached the sheet"""
+
+    def __init__(self, row: List[Any]):
+        self.row = row
+        self.queued_at = time.monotonic()
+        self.attempts = 0
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        """Whether the row has been written to the sheet"""
+        return self._done.is_set()
+
+    def _resolve(self) -> None:
+        self._done.set()
+
+
+class AppendWriteQueue:
+    """Write-behind queue that batches sheet appends into single append_rows calls
+
+    Rows are flushed by a background worker as soon as ``batch_size`` rows are
+    waiting or the oldest row has waited ``max_delay_seconds``. A failed flush
+    leaves the rows at the head of the queue so they are retried on the next
+    flush instead of being lost; the wait before the next attempt doubles
+    with every consecutive failure, up to ``max_backoff_seconds``. A failed
+    append may still have reached the sheet, so before a batch is sent again
+    its row IDs are looked up in the sheet and only the missing rows are
+    appended.
+    """
+
+    def __init__(self, sheets_service, batch_size: int, max_delay_seconds: float, max_backoff_seconds: float):
+        self.sheets_service = sheets_service
+        self.batch_size = batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._pending: List[PendingWrite] = []
+        self._retry_after = 0.0
+        self._failures = 0
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="sheet-append-queue", daemon=True)
+        self._worker.start()
+
+    def submit_many(self, rows: List[List[Any]]) -> List[PendingWrite]:
+        """Queue several rows so they go out together"""
+        writes = [PendingWrite(row) for row in rows]
+        with self._condition:
+            self._pending.extend(writes)
+            self._condition.notify()
+        return writes
+
+    def _run(self) -> None:
+        """Worker loop: wait for a size or age threshold, then flush"""
+        while True:
+            with self._condition:
+                while not self._should_flush():
+                    timeout = None
+                    if self._pending:
+                        now = time.monotonic()
+                        age = now - self._pending[0].queued_at
+                        timeout = max(self.max_delay_seconds - age, self._retry_after - now, 0.0)
+                    self._condition.wait(timeout)
+                batch = self._pending[:self.batch_size]
+
+            self._flush(batch)
+
+    def _should_flush(self) -> bool:
+        if not self._pending or time.monotonic() < self._retry_after:
+            return False
+        if len(self._pending) >= self.batch_size:
+            return True
+        return time.monotonic() - self._pending[0].queued_at >= self.max_delay_seconds
+
+    def _flush(self, batch: List[PendingWrite]) -> None:
+        """Append a batch with one API call and mark its rows done on success"""
+        retrying = any(write.attempts for write in batch)
+        for write in batch:
+            write.attempts += 1
+
+        if retrying:
+            try:
+                already_written = self.sheets_service.get_row_ids(priority=PRIORITY_BACKGROUND)
+            except Exception:
+                self._finish(batch, False)
+                return
+            unsent = [write for write in batch if self._row_id(write) not in already_written]
+        else:
+            unsent = batch
+
+        success = True
+        if unsent:
+            success, _ = self.sheets_service.append_rows([write.row for write in unsent])
+        self._finish(batch, success)
+
+    def _finish(self, batch: List[PendingWrite], success: bool) -> None:
+        """Drop a written batch from the queue, or keep it and back off"""
+        with self._condition:
+            if success:
+                del self._pending[:len(batch)]
+                self._failures = 0
+            else:
+                # Keep the rows queued and wait longer after every consecutive failure
+                self._failures += 1
+                backoff = min(self.max_delay_seconds * 2 ** (self._failures - 1), self.max_backoff_seconds)
+                self._retry_after = time.monotonic() + backoff
+
+        if success:
+            for write in batch:
+                write._resolve()
+
+    @staticmethod
+    def _row_id(write: PendingWrite) -> Optional[str]:
+        """Row ID carried in the row's own column; rows without one are always resent"""
+        if len(write.row) > Config.ROW_ID_COLUMN_INDEX:
+            return str(write.row[Config.ROW_ID_COLUMN_INDEX])
+        return None
+
+
+@st.cache_resource
+def get_write_queue(_sheets_service) -> AppendWriteQueue:
+    """Get the process-wide append queue"""
+    return AppendWriteQueue(
+        _sheets_service,
+        batch_size=Config.WRITE_QUEUE_BATCH_SIZE,
+        max_delay_seconds=Config.WRITE_QUEUE_MAX_DELAY_SECONDS,
+        max_backoff_seconds=Config.WRITE_QUEUE_MAX_BACKOFF_SECONDS
+    )
@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+
 def get_main_css() -> str:
     """Get main CSS styles for the application"""
     return """
@@ -125,6 +128,7 @@ def get_main_css() -> str:
     </style>
     """
 
+@lru_cache(maxsize=None)
 def get_calendar_css(theme: str) -> str:
     """Get CSS for calendar display based on theme"""
     from config.config import Config
@@ -222,4 +226,118 @@ def get_calendar_css(theme: str) -> str:
         }}
     }}
     </style>
-    """
\ No newline at end of file
+    """
+
+
+def get_leave_calendar_css() -> str:
+    """Get CSS for the leave calendar"""
+    return """
+    <style>
+    .leave-calendar-container {
+        font-family: -apple-system, BlinkMacSystemFont, sans-serif;
+        margin: 0 auto;
+        max-width: 100%;
+        background: white;
+        border-radius: 12px;
+        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        overflow: hidden;
+    }
+    
+    .leave-calendar-header {
+        background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%);
+        color: white;
+        text-align: center;
+        padding: 0.8rem;
+        font-size: 0.95rem;
+        font-weight: 600;
+    }
+    
+    .leave-calendar-grid {
+        display: grid;
+        grid-template-columns: repeat(7, 1fr);
+        gap: 1px;
+        background: #e9ecef;
+    }
+    
+    .leave-day-header {
+        background: #f8f9fa;
+        padding: 0.4rem 0.2rem;
+        text-align: center;
+        font-weight: 600;
+        font-size: 0.75rem;
+        color: #6c757d;
+        border-bottom: 1px solid #dee2e6;
+    }
+    
+    .leave-calendar-day {
+        background: white;
+        min-height: 70px;
+        padding: 0.25rem;
+        display: flex;
+        flex-direction: column;
+        position: relative;
+        border: 1px solid #f0f0f0;
+    }
+    
+    .leave-calendar-day.other-month {
+        background: #f8f9fa;
+        color: #adb5bd;
+    }
+    
+    .leave-calendar-day.today {
+        background: #fff3cd;
+        border: 2px solid #ffc107;
+    }
+    
+    .leave-day-number {
+        font-weight: 600;
+        font-size: 0.85rem;
+        margin-bottom: 0.2rem;
+        color: #495057;
+    }
+    
+    .leave-indicator {
+        font-size: 0.6rem;
+        font-weight: 600;
+        padding: 0.1rem 0.25rem;
+        border-radius: 6px;
+        margin: 0.05rem 0;
+        text-align: center;
+        border: 1px solid;
+    }
+    
+    .leave-maid {
+        background: #fce4ec;
+        color: #e91e63;
+        border-color: #f8bbd9;
+    }
+    
+    .leave-cook {
+        background: #e3f2fd;
+        color: #2196f3;
+        border-color: #bbdefb;
+    }
+    
+    @media (max-width: 768px) {
+        .leave-calendar-day {
+            min-height: 60px;
+            padding: 0.2rem;
+        }
+        .leave-day-number {
+            font-size: 0.75rem;
+        }
+        .leave-indicator {
+            font-size: 0.55rem;
+            padding: 0.05rem 0.2rem;
+        }
+    }
+    </style>
+    """
+
+
+@lru_cache(maxsize=1)
+def get_all_calendar_css() -> str:
+    """CSS for every calendar theme and the leave calendar, emitted once per page"""
+    from config.config import Config
+    
+    return "".join([get_calendar_css(theme) for theme in Config.CALENDAR_THEMES] + [get_leave_calendar_css()])
@@ -0,0 +1,31 @@
+import calendar
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+# Private Sunday-first calendar; the module-level calendar.setfirstweekday is
+# process-global state shared by every session thread, so it is never touched
+_SUNDAY_FIRST = calendar.Calendar(firstweekday=calendar.SUNDAY)
+
+WEEKDAY_NAMES = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+
+class MonthLayout(NamedTuple):
+    """Sunday-first grid of a month"""
+    weeks: Tuple[Tuple[int, ...], ...]  # day numbers per week, 0 outside the month
+    week_numbers: Tuple[int, ...]  # ISO week number of each row (taken from its Monday)
+    days_in_month: int
+    year_offset: int  # day of the year of the 1st, counted from 0
+
+
+@lru_cache(maxsize=256)
+def month_layout(year: int, month: int) -> MonthLayout:
+    """Layout of a month, computed once and shared by every calendar renderer"""
+    weeks = tuple(tuple(week) for week in _SUNDAY_FIRST.monthdayscalendar(year, month))
+    week_numbers = tuple(week[1].isocalendar()[1] for week in _SUNDAY_FIRST.monthdatescalendar(year, month))
+    return MonthLayout(
+        weeks=weeks,
+        week_numbers=week_numbers,
+        days_in_month=calendar.monthrange(year, month)[1],
+        year_offset=date(year, month, 1).timetuple().tm_yday - 1,
+    )